@@ -0,0 +1,143 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Default work factors: scrypt N = 2**14 (about 16 MB, tens of ms), PBKDF2 2**19 iterations
+DEFAULT_COST = {"scrypt": 14, "pbkdf2": 19}
+
+
+class PasswordHasher:
+    """Salted password hashing with a tunable cost.
+
+    Hashes are stored as self-describing strings, for example
+    "scrypt$14$8$1$<salt>$<hash>" or "pbkdf2_sha256$19$<salt>$<hash>".
+    Raising the cost later does not break old hashes: verify() reads the cost
+    from the string, and needs_rehash() marks the hash for an upgrade at the
+    next successful login. Plaintext values from the old users.csv never
+    verify; UserStore hashes them when they are migrated.
+    """
+
+    def __init__(self, algorithm="scrypt", cost=None, r=8, p=1):
+        if algorithm == "scrypt" and not hasattr(hashlib, "scrypt"):
+            algorithm = "pbkdf2"  # Python built without OpenSSL scrypt support
+        self.algorithm = algorithm
+        self.cost = DEFAULT_COST[algorithm] if cost is None else cost
+        self.r = r
+        self.p = p
+
+    def hash(self, password):
+        salt = secrets.token_bytes(16)
+        if self.algorithm == "scrypt":
+            digest = _scrypt(password, salt, self.cost, self.r, self.p)
+            return f"scrypt${self.cost}${self.r}${self.p}${salt.hex()}${digest.hex()}"
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, 2 ** self.cost)
+        return f"pbkdf2_sha256${self.cost}${salt.hex()}${digest.hex()}"
+
+    def verify(self, password, stored):
+        """Check a password against a stored hash in constant time."""
+        parts = stored.split("$")
+        if parts[0] == "scrypt" and len(parts) == 6:
+            cost, r, p, salt, expected = int(parts[1]), int(parts[2]), int(parts[3]), parts[4], parts[5]
+            digest = _scrypt(password, bytes.fromhex(salt), cost, r, p)
+        elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            cost, salt, expected = int(parts[1]), parts[2], parts[3]
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), 2 ** cost)
+        else:
+            return False
+        return hmac.compare_digest(digest.hex(), expected)
+
+    def needs_rehash(self, stored):
+        """True if `stored` is plaintext or was hashed with other settings than this hasher's."""
+        parts = stored.split("$")
+        if self.algorithm == "scrypt":
+            return parts[:4] != ["scrypt", str(self.cost), str(self.r), str(self.p)]
+        return parts[:2] != ["pbkdf2_sha256", str(self.cost)]
+
+
+def _scrypt(password, salt, cost, r, p):
+    n = 2 ** cost
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=32, maxmem=256 * r * n + (1 << 20))
+
+
+class SessionCache:
+    """Short-lived record of successful logins, keyed by a random session token.
+
+    Once a password is verified, later requests show the token instead, and
+    checking it is a dict lookup rather than another expensive hash. At most
+    `max_sessions` tokens are kept; the oldest is evicted first.
+    """
+
+    def __init__(self, ttl=900, max_sessions=10000):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # token -> (username, expires_at)
+        self._lock = threading.Lock()
+
+    def issue(self, username):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[token] = (username, time.monotonic() + self.ttl)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """The username for a live token, or None."""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if session[1] < time.monotonic():
+                del self._sessions[token]
+                return None
+            return session[0]
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+
+class Authenticator:
+    """Logins and account creation against a UserStore, with hashing on worker threads.
+
+    The *_async methods return a concurrent.futures.Future, so a GUI thread
+    can start a login and poll for the result instead of blocking on scrypt.
+    """
+
+    def __init__(self, users, hasher=None, workers=2, session_ttl=900):
+        self.users = users
+        self.hasher = hasher or PasswordHasher()
+        self.sessions = SessionCache(session_ttl)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+
+    def login(self, username, password):
+        """Verify a password. Returns a session token, or None if the login failed."""
+        stored = self.users.get_password(username)
+        if stored is None:
+            self.hasher.hash(password)  # same work as a real check, so unknown names aren't faster
+            return None
+        if not self.hasher.verify(password, stored):
+            return None
+        if self.hasher.needs_rehash(stored):
+            self.users.set_password(username, self.hasher.hash(password))
+        return self.sessions.issue(username)
+
+    def create_account(self, username, password):
+        """Create an account with a hashed password. Returns False if the username is taken."""
+        return self.users.add(username, self.hasher.hash(password))
+
+    def login_async(self, username, password):
+        return self._executor.submit(self.login, username, password)
+
+    def create_account_async(self, username, password):
+        return self._executor.submit(self.create_account, username, password)
+
+    def session_user(self, token):
+        return self.sessions.get(token)
+
+    def logout(self, token):
+        self.sessions.revoke(token)
@@ -0,0 +1,532 @@
+"""Benchmarks for the schedule manager.
+
+Run one or more by name, e.g. `python benchmarks.py login`.
+Run with no name to list the available benchmarks.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from auth_module import Authenticator, PasswordHasher
+from storage_module import UserStore
+
+
+# Function to time logins per second at each password hashing cost
+def bench_login(costs=(12, 13, 14, 15), logins=16, workers=2):
+    users = UserStore(":memory:")
+    print(f"{'algorithm':<10}{'cost':>6}{'ms/login':>12}{'logins/s':>12}{'logins/s x' + str(workers):>16}")
+    for algorithm in ("scrypt", "pbkdf2"):
+        algorithm_costs = costs if algorithm == "scrypt" else tuple(cost + 5 for cost in costs)
+        for cost in algorithm_costs:
+            auth = Authenticator(users, PasswordHasher(algorithm, cost), workers=workers)
+            username = f"{algorithm}-{cost}"
+            auth.create_account(username, "correct horse")
+
+            start = time.perf_counter()
+            for _ in range(logins):
+                assert auth.login(username, "correct horse")
+            serial = time.perf_counter() - start
+
+            start = time.perf_counter()
+            futures = [auth.login_async(username, "correct horse") for _ in range(logins)]
+            assert all(future.result() for future in futures)
+            pooled = time.perf_counter() - start
+
+            print(f"{algorithm:<10}{cost:>6}{serial / logins * 1000:>12.1f}{logins / serial:>12.1f}{logins / pooled:>16.1f}")
+
+
+# Function to build a ScheduleBuilder holding `rows` one-off events spread over two years
+def make_builder(rows):
+    from trial_1 import ScheduleBuilder
+
+    builder = ScheduleBuilder()
+    for i in range(rows):
+        day = 1 + i % 28
+        # Rows repeat the same slots, so conflict checks would keep only a few thousand of them
+        builder.block_time(2040 + (i // 336) % 2, 1 + (i // 28) % 12, day, 8 + i % 9, 9 + i % 9,
+                           f"Event {i}", f"user{i % 500}@example.com", "Benchmark event", allow_conflicts=True)
+    return builder
+
+
+# Function to compare export throughput of every format against the old pandas/Excel path
+def bench_export(rows=100000):
+    builder = make_builder(rows)
+    os.chdir(tempfile.mkdtemp(prefix="schedule-bench-"))
+    print(f"{'format':<16}{'seconds':>10}{'rows/s':>12}{'file KB':>10}")
+
+    def report(label, count, seconds, path):
+        print(f"{label:<16}{seconds:>10.2f}{count / seconds:>12.0f}{os.path.getsize(path) / 1024:>10.0f}")
+
+    try:
+        import pandas as pd
+        start = time.perf_counter()
+        data = [[date[0], date[1], date[2], event.start_hour, event.end_hour, event.name, event.email, event.description]
+                for date, event in builder.iter_events()]
+        pd.DataFrame(data, columns=["Year", "Month", "Day", "Start Hour", "End Hour", "Name", "Email", "Description"]).to_excel("pandas.xlsx", index=False)
+        report("pandas excel", len(data), time.perf_counter() - start, "pandas.xlsx")
+    except ImportError:
+        print("pandas excel    skipped (pandas not installed)")
+
+    for format, path in [("excel", "schedule.xlsx"), ("csv", "schedule.csv"), ("jsonl", "schedule.jsonl"),
+                         ("parquet", "schedule.parquet"), ("arrow", "schedule.arrow")]:
+        start = time.perf_counter()
+        result = builder.export_schedule(format)
+        if not os.path.exists(path):
+            print(f"{format:<16}skipped ({result})")
+            continue
+        # "Exported N events to ..."
+        report(format, int(result.split()[1]), time.perf_counter() - start, path)
+
+
+# The pre-slots Event, kept here so the memory benchmark has a baseline
+class DictEvent:
+    def __init__(self, start_hour, end_hour, name, email, description="", recurrence=1):
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.name = name
+        self.email = email
+        self.description = description
+        self.recurrence = recurrence
+        self.event_id = None
+        self.date_time = None
+        self.end_time = None
+        self.updated_at = None
+        self.rule = None
+        self.master = None
+
+
+# Function to build `count` events of one class, with names/emails repeating the way real calendars do
+def make_events(event_class, count):
+    base = datetime(2040, 1, 1)
+    events = []
+    for i in range(count):
+        # Fresh string objects each time, as they would arrive from a form, file or database
+        event = event_class(9, 10, "Team sync " + str(i % 200), "user" + str(i % 500) + "@example.com", "Weekly")
+        event.event_id = "%032x" % i
+        event.date_time = base + timedelta(hours=i)
+        event.end_time = event.date_time + timedelta(hours=1)
+        event.updated_at = base
+        events.append(event)
+    return events
+
+
+# Function to measure bytes allocated by `build()` and still alive afterwards
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, used
+
+
+# Function to report bytes per event for the old Event, the slotted Event and an EventTable
+def bench_memory(count=100000):
+    from trial_1 import Event, EventTable
+
+    print(f"{'representation':<24}{'bytes/event':>12}")
+    _, used = measure(lambda: make_events(DictEvent, count))
+    print(f"{'Event with __dict__':<24}{used / count:>12.0f}")
+    events, used = measure(lambda: make_events(Event, count))
+    print(f"{'Event with __slots__':<24}{used / count:>12.0f}")
+    _, used = measure(lambda: EventTable.from_events(events))
+    print(f"{'EventTable':<24}{used / count:>12.0f}")
+
+
+# Function to make `count` import rows spread over two years
+def make_rows(count):
+    return [{"year": 2040 + (i // 336) % 2, "month": 1 + (i // 28) % 12, "day": 1 + i % 28, "start_hour": 8 + i % 9,
+             "end_hour": 9 + i % 9, "name": f"Event {i}", "email": f"user{i % 500}@example.com", "description": "Imported"}
+            for i in range(count)]
+
+
+# Function to compare bulk_load against calling block_time once per row, in memory and with a store
+def bench_bulk_load(count=50000):
+    from storage_module import ScheduleStore
+    from trial_1 import ScheduleBuilder
+
+    rows = make_rows(count)
+    directory = tempfile.mkdtemp(prefix="schedule-bench-")
+    print(f"{'method':<28}{'seconds':>10}{'rows/s':>12}")
+    for storage in ("memory", "sqlite"):
+        for method in ("block_time loop", "bulk_load"):
+            store = ScheduleStore(os.path.join(directory, f"{method}.db")) if storage == "sqlite" else None
+            builder = ScheduleBuilder(store=store)
+            start = time.perf_counter()
+            if method == "bulk_load":
+                builder.bulk_load(rows)
+            else:
+                for row in rows:
+                    builder.block_time(row["year"], row["month"], row["day"], row["start_hour"], row["end_hour"],
+                                       row["name"], row["email"], row["description"], allow_conflicts=True)
+            seconds = time.perf_counter() - start
+            print(f"{method + ' (' + storage + ')':<28}{seconds:>10.2f}{count / seconds:>12.0f}")
+
+
+# Function to write a `count`-event .ics file, one in ten of them a weekly series
+def make_ics(path, count):
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//EN\r\n")
+        for i in range(count):
+            start = datetime(2040, 1, 1, 8) + timedelta(days=i // 9, hours=i % 9)
+            f.write("BEGIN:VEVENT\r\n"
+                    f"UID:bench-{i}@example.com\r\n"
+                    f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n"
+                    f"DTEND:{start + timedelta(hours=1):%Y%m%dT%H%M%S}\r\n"
+                    f"SUMMARY:Event {i}\r\n"
+                    f"ORGANIZER;CN=User {i % 500}:mailto:user{i % 500}@example.com\r\n"
+                    "DESCRIPTION:Imported from another calendar tool\\, with a description long enough\r\n"
+                    " to be folded onto a continuation line\r\n"
+                    + ("RRULE:FREQ=WEEKLY;COUNT=10\r\n" if i % 10 == 0 else "")
+                    + "BEGIN:VALARM\r\nACTION:DISPLAY\r\nTRIGGER:-PT10M\r\nEND:VALARM\r\n"
+                    "END:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+# Function to time parsing, importing and exporting a `count`-event .ics file, with peak parser memory
+def bench_ics(count=100000):
+    from ical_module import read_ics_rows, write_ics
+    from trial_1 import ScheduleBuilder
+
+    directory = tempfile.mkdtemp(prefix="schedule-bench-")
+    path = os.path.join(directory, "feed.ics")
+    make_ics(path, count)
+    size = os.path.getsize(path) / 1024 / 1024
+    print(f"{count} events, {size:.1f} MB")
+    print(f"{'step':<12}{'seconds':>10}{'events/s':>12}{'MB/s':>8}")
+
+    def report(label, seconds):
+        print(f"{label:<12}{seconds:>10.2f}{count / seconds:>12.0f}{size / seconds:>8.1f}")
+
+    start = time.perf_counter()
+    for _ in read_ics_rows(path):
+        pass
+    report("parse", time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in read_ics_rows(path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    builder = ScheduleBuilder()
+    start = time.perf_counter()
+    builder.import_file(path)
+    report("import", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    written = write_ics(builder.iter_series(), os.path.join(directory, "export.ics"))
+    report("export", time.perf_counter() - start)
+    assert written == count
+    print(f"parser peak memory: {peak / 1024:.0f} KB")
+
+
+# Function to time viewing every day twice and exporting to Word twice, with the render cache's counters
+def bench_render(rows=100000):
+    from datetime import date
+    from trial_1 import ScheduleBuilder
+
+    builder = ScheduleBuilder()
+    builder.bulk_load(make_rows(rows))
+    days = sorted({date(*day) for day, _ in builder.iter_events()})
+    os.chdir(tempfile.mkdtemp(prefix="schedule-bench-"))
+    print(f"{len(days)} days, {rows} events")
+    print(f"{'step':<24}{'seconds':>10}{'hits':>10}{'misses':>10}")
+
+    def report(label, seconds):
+        stats = builder.render_cache.stats()
+        print(f"{label:<24}{seconds:>10.2f}{stats['hits']:>10}{stats['misses']:>10}")
+
+    for label in ("view every day (cold)", "view every day (warm)"):
+        start = time.perf_counter()
+        for day in days:
+            builder.view_schedule(day.year, day.month, day.day)
+        report(label, time.perf_counter() - start)
+    for label in ("word export", "word export again"):
+        start = time.perf_counter()
+        builder.export_schedule("word")
+        report(label, time.perf_counter() - start)
+
+
+# Function to compare python-docx with the streaming Word writer, then time the writer by worker count
+def bench_word(rows=100000, docx_rows=2000):
+    import hashlib
+    from itertools import groupby
+    from trial_1 import ScheduleBuilder
+    from word_export_module import export_word
+
+    builder = ScheduleBuilder()
+    builder.bulk_load(make_rows(rows))
+    days = [(date, builder.render_day([event for _, event in events]))
+            for date, events in groupby(builder.iter_events(), key=lambda item: item[0])]
+    small = []
+    for date, rendered in days:
+        if sum(len(day) for _, day in small) >= docx_rows:
+            break
+        small.append((date, rendered))
+    directory = tempfile.mkdtemp(prefix="schedule-bench-")
+    print(f"{'writer':<24}{'events':>8}{'seconds':>10}{'events/s':>10}  sha256")
+
+    def report(label, count, seconds, path):
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        print(f"{label:<24}{count:>8}{seconds:>10.2f}{count / seconds:>10.0f}  {digest}")
+
+    try:
+        from docx import Document
+        path = os.path.join(directory, "python-docx.docx")
+        start = time.perf_counter()
+        doc = Document()
+        doc.add_heading('Schedule', level=1)
+        for date, rendered in small:
+            doc.add_heading(f"Date: {date[1]}/{date[2]}/{date[0]}", level=2)
+            for line, description in rendered:
+                doc.add_paragraph(line)
+                if description:
+                    doc.add_paragraph(f"Description: {description}")
+        doc.save(path)
+        report("python-docx", sum(len(rendered) for _, rendered in small), time.perf_counter() - start, path)
+    except ImportError:
+        print("python-docx             skipped (python-docx not installed)")
+
+    path = os.path.join(directory, "small.docx")
+    start = time.perf_counter()
+    count = export_word(small, path)
+    report("streaming", count, time.perf_counter() - start, path)
+
+    # Up to the core count, and at least 4 so the pool overhead shows on small machines
+    workers = 1
+    while workers <= max(4, os.cpu_count() or 1):
+        path = os.path.join(directory, f"workers-{workers}.docx")
+        start = time.perf_counter()
+        count = export_word(days, path, workers=workers)
+        report(f"streaming, {workers} worker{'s' if workers > 1 else ''}", count, time.perf_counter() - start, path)
+        workers *= 2
+
+
+# Function to send one keep-alive HTTP request and return (status, JSON body)
+async def http_request(reader, writer, method, path, body=None, token=None):
+    import json
+
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(payload)}\r\n"
+    if token:
+        head += f"Authorization: Bearer {token}\r\n"
+    writer.write((head + "\r\n").encode("latin-1") + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length)) if length else None
+
+
+# Function to load-test the HTTP service: p50/p99 latency of a view/book mix at each client count
+def bench_service(clients=(1, 10, 50), requests_per_client=100, users=10):
+    import asyncio
+    import threading
+    from storage_module import ScheduleStore
+    from notifier_module import make_notifier
+    from service_module import ScheduleService
+    from trial_1 import make_tenants
+
+    directory = tempfile.mkdtemp(prefix="schedule-bench-")
+    tenants = make_tenants(ScheduleStore(os.path.join(directory, "schedule.db")), make_notifier(["none"]))
+    auth = Authenticator(UserStore(":memory:"), PasswordHasher("scrypt", 10))
+    service = ScheduleService(tenants, auth, export_dir=os.path.join(directory, "exports"))
+    ready = threading.Event()
+    ports = []
+    threading.Thread(target=lambda: asyncio.run(service.serve("127.0.0.1", 0, lambda port: (ports.append(port), ready.set()))),
+                     daemon=True).start()
+    ready.wait()
+
+    async def client(number, tokens, latencies, run):
+        reader, writer = await asyncio.open_connection("127.0.0.1", ports[0])
+        token = tokens[number % users]
+        for i in range(requests_per_client):
+            # Three views to one booking, each booking in its own slot so none conflict
+            slot = (run * max(clients) + number) * requests_per_client + i
+            start = time.perf_counter()
+            if i % 4 == 3:
+                day = datetime(2040, 1, 1) + timedelta(days=slot // 16)
+                status, _ = await http_request(reader, writer, "POST", "/events", {
+                    "year": day.year, "month": day.month, "day": day.day, "start_hour": 6 + slot % 16,
+                    "end_hour": 7 + slot % 16, "name": f"Event {slot}", "email": "bench@example.com"}, token)
+                assert status == 201, status
+            else:
+                status, _ = await http_request(reader, writer, "GET", f"/schedule?date=2040-01-{1 + i % 28:02d}",
+                                               token=token)
+                assert status == 200, status
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    async def main():
+        reader, writer = await asyncio.open_connection("127.0.0.1", ports[0])
+        tokens = []
+        for user in range(users):
+            credentials = {"username": f"user{user}", "password": "correct horse"}
+            await http_request(reader, writer, "POST", "/accounts", credentials)
+            tokens.append((await http_request(reader, writer, "POST", "/login", credentials))[1]["token"])
+        writer.close()
+        print(f"{'clients':>8}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for run, count in enumerate(clients):
+            latencies = []
+            start = time.perf_counter()
+            await asyncio.gather(*(client(number, tokens, latencies, run) for number in range(count)))
+            seconds = time.perf_counter() - start
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{count:>8}{len(latencies):>10}{len(latencies) / seconds:>10.0f}{p50:>10.1f}{p99:>10.1f}")
+
+    asyncio.run(main())
+    tenants.stop()
+
+
+# Function to time reminder catch-up after a simulated outage, with `events` events in the next two days
+def bench_recovery(events=20000, outage_hours=(1, 6, 24)):
+    from storage_module import ScheduleStore
+    from notifier_module import make_notifier
+    from trial_1 import ScheduleBuilder
+
+    class NullMailer:
+        def send_batch(self, messages):
+            return [None] * len(messages)
+
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    rows = []
+    for i in range(events):
+        start = now + timedelta(hours=1 + i % 47)
+        rows.append({"year": start.year, "month": start.month, "day": start.day, "start_hour": start.hour,
+                     "end_hour": start.hour + 1, "name": f"Event {i}", "email": f"user{i % 500}@example.com"})
+    print(f"{'outage h':>9}{'outbox rows':>13}{'seconds':>10}{'sent':>8}{'skipped':>9}{'rows/s':>10}")
+    for hours in outage_hours:
+        directory = tempfile.mkdtemp(prefix="schedule-bench-")
+        store = ScheduleStore(os.path.join(directory, "schedule.db"))
+        writer = ScheduleBuilder(NullMailer(), store=store, owner="bench", notifier=make_notifier(["none"]))
+        writer.bulk_load(rows)
+        writer.delivery.stop()
+        total = sum(store.reminder_counts("bench").values())
+        # A fresh process starting `hours` after the last one stopped; loading the schedule is not timed
+        builder = ScheduleBuilder(NullMailer(), store=store, owner="bench", notifier=make_notifier(["none"]))
+        builder.load_upcoming()
+        start = time.perf_counter()
+        builder.catch_up_reminders(datetime.now() + timedelta(hours=hours))
+        builder.delivery.join()
+        seconds = time.perf_counter() - start
+        counts = store.reminder_counts("bench")
+        handled = counts.get("sent", 0) + counts.get("skipped", 0) + counts.get("failed", 0)
+        print(f"{hours:>9}{total:>13}{seconds:>10.2f}{counts.get('sent', 0):>8}{counts.get('skipped', 0):>9}"
+              f"{handled / seconds:>10.0f}")
+
+
+# Function to compare delivery against a throttling SMTP server: no retries, retries only, and rate limit plus retries
+def bench_delivery(messages=300, server_rate=40, server_burst=20):
+    import smtplib
+    from email_module import SMTPConnectionPool, TokenBucket
+
+    class ThrottlingServer:
+        """Stand-in SMTP session refusing with 421 over `server_rate` messages/s, and 550 for unknown users."""
+
+        def __init__(self, throttle):
+            self.throttle = throttle
+
+        def sendmail(self, from_addr, to_addrs, message):
+            if to_addrs.startswith("unknown"):
+                raise smtplib.SMTPRecipientsRefused({to_addrs: (550, b"5.1.1 No such user")})
+            with self.throttle._lock:
+                now = time.monotonic()
+                self.throttle.tokens = min(self.throttle.burst,
+                                           self.throttle.tokens + (now - self.throttle.updated) * self.throttle.rate)
+                self.throttle.updated = now
+                if self.throttle.tokens < 1:
+                    raise smtplib.SMTPDataError(421, b"4.7.0 Try again later")
+                self.throttle.tokens -= 1
+
+        def quit(self):
+            pass
+
+    class BenchPool(SMTPConnectionPool):
+        def connect(self):
+            return ThrottlingServer(self.throttle)
+
+    batch = [("bench@example.com", f"{'unknown' if i % 100 == 99 else 'user'}{i}@example.com", "Subject: Reminder\n\nHi")
+             for i in range(messages)]
+    print(f"{'mode':<22}{'seconds':>9}{'sent':>7}{'retried':>9}{'dropped':>9}")
+    for mode, rate, retries in (("no retries", None, 0), ("retries", None, 4), ("rate limit + retries", server_rate * 0.9, 4)):
+        pool = BenchPool("bench", 25, f"{mode}@example.com", size=2, rate=rate, burst=server_burst, max_retries=retries,
+                         retry_base=0.5, retry_cap=8)
+        pool.throttle = TokenBucket(server_rate, server_burst)
+        start = time.perf_counter()
+        for first in range(0, messages, 50):  # the delivery queue hands the pool batches of 50
+            pool.send_batch(batch[first:first + 50])
+        stats = pool.stats()
+        print(f"{mode:<22}{time.perf_counter() - start:>9.2f}{stats['sent']:>7}{stats['retried']:>9}{stats['dropped']:>9}")
+
+
+# Milliseconds `import trial_1` may take before the startup benchmark fails
+STARTUP_BUDGET_MS = 400
+
+# Modules only needed once the user sends, exports or opens a date picker; none may load at startup
+DEFERRED_MODULES = ("tkcalendar", "babel", "email.mime", "smtplib", "ssl", "openpyxl", "pyarrow", "docx", "pandas",
+                    "word_export_module", "concurrent.futures.process", "tkinter", "grid_view_module")
+
+
+# Function to time `import trial_1` with -X importtime and fail if it is over budget or loads a deferred module
+def bench_startup(runs=5, show=12):
+    import subprocess
+
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import trial_1"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            raise SystemExit(f"import trial_1 failed:\n{result.stderr}")
+        imports = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                imports[name.strip()] = int(cumulative) / 1000
+        if best is None or imports["trial_1"] < best["trial_1"]:
+            best = imports
+    print(f"import trial_1: {best['trial_1']:.0f} ms (best of {runs}, budget {STARTUP_BUDGET_MS} ms)")
+    for name, ms in sorted(best.items(), key=lambda item: -item[1])[1:show + 1]:
+        print(f"  {name:<32}{ms:>8.1f} ms")
+    loaded = [name for name in best if any(name == module or name.startswith(module + ".") for module in DEFERRED_MODULES)]
+    if loaded:
+        raise SystemExit("Loaded at startup but should be deferred: " + ", ".join(sorted(loaded)))
+    if best["trial_1"] > STARTUP_BUDGET_MS:
+        raise SystemExit(f"Startup over budget: {best['trial_1']:.0f} ms > {STARTUP_BUDGET_MS} ms")
+
+
+BENCHMARKS = {
+    "login": bench_login,
+    "export": bench_export,
+    "memory": bench_memory,
+    "bulk_load": bench_bulk_load,
+    "ics": bench_ics,
+    "render": bench_render,
+    "word": bench_word,
+    "service": bench_service,
+    "startup": bench_startup,
+    "recovery": bench_recovery,
+    "delivery": bench_delivery,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    if not names:
+        print("Available benchmarks: " + ", ".join(BENCHMARKS))
+    for name in names:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,65 @@
+import csv
+import json
+
+# Alternative column names accepted by the readers, mapped to block_time's argument names
+COLUMN_ALIASES = {
+    "event": "name",
+    "title": "name",
+    "start": "start_hour",
+    "end": "end_hour",
+}
+
+
+# Function to turn a row with any of the accepted spellings into block_time's argument names
+def normalize_row(row):
+    if not isinstance(row, dict):
+        raise ValueError(f"expected an object with event fields, got {type(row).__name__}")
+    normalized = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(" ", "_")
+        normalized[COLUMN_ALIASES.get(key, key)] = value
+    # ISO "YYYY-MM-DD" dates (our CSV/JSON Lines exports) instead of year/month/day columns
+    if "date" in normalized and "year" not in normalized:
+        date = str(normalized.pop("date"))
+        parts = date[:10].split("-")
+        if len(parts) != 3:
+            raise ValueError(f"invalid date {date!r}, expected YYYY-MM-DD")
+        normalized.update(year=parts[0], month=parts[1], day=parts[2])
+    return normalized
+
+
+# Function to normalize one raw row, or return the error instead so bulk_load reports it against that row
+def checked_row(raw, parse=None):
+    try:
+        return normalize_row(parse(raw) if parse is not None else raw)
+    except ValueError as e:
+        return e
+
+
+# Function to stream rows from a CSV file with a header line
+def read_csv_rows(path):
+    with open(path, mode='r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield checked_row(row)
+
+
+# Function to read rows from a JSON file (a list, or an object with an "events" list) or JSON Lines
+def read_json_rows(path):
+    with open(path, mode='r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if not first:
+            return
+        if first == "[" or first == "{" and path.endswith(".json"):
+            data = json.loads(first + f.read())
+            for row in data.get("events", []) if isinstance(data, dict) else data:
+                yield checked_row(row)
+            return
+        # JSON Lines: one object per line, read as it streams; a bad line is reported as that row's error
+        yield checked_row(first + f.readline(), json.loads)
+        for line in f:
+            if line.strip():
+                yield checked_row(line, json.loads)
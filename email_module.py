@@ -0,0 +1,375 @@
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Token buckets shared by every pool sending as the same account: (host, username) -> TokenBucket
+_account_buckets = {}
+_account_buckets_lock = threading.Lock()
+
+
+def is_connection_error(error):
+    """True if `error` means the SMTP session is gone rather than the message was rejected."""
+    import smtplib
+
+    # SMTPException subclasses OSError, so plain socket errors need the second check
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def is_transient(error):
+    """True if sending may succeed later: a dropped connection, a timeout, or a 4xx reply such as throttling."""
+    import smtplib
+
+    if is_connection_error(error):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    return isinstance(error, smtplib.SMTPResponseException) and 400 <= error.smtp_code < 500
+
+
+# Function to pick the wait before retry number `attempt` (0-based): exponential backoff with full jitter
+def backoff_delay(attempt, base, cap):
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, in bursts of up to `burst`.
+
+    acquire() reserves the next token and sleeps until it is due, so
+    waiting threads are served in the order they arrived.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until it is available. Returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+# Function to get the token bucket of one SMTP account, creating it with `rate` and `burst` on first use
+def account_bucket(host, username, rate, burst):
+    with _account_buckets_lock:
+        bucket = _account_buckets.get((host, username))
+        if bucket is None:
+            bucket = _account_buckets[(host, username)] = TokenBucket(rate, burst)
+        return bucket
+
+
+class SMTPConnectionPool:
+    """A pool of logged-in SMTP sessions that are reused across sends.
+
+    Up to `size` sessions are open at once. send_batch() splits the messages
+    across that many sessions, so a burst of reminders does one TLS handshake
+    and one login per session instead of one per email. A session that drops
+    is reconnected once and the message is retried on the new session.
+
+    With a `rate`, sends are paced by a token bucket shared by all pools of
+    the same account, so a burst stays under the provider's limits. Messages
+    that fail with a transient error (4xx reply, dropped connection) are
+    retried up to `max_retries` times, with exponential backoff and jitter
+    between rounds. Messages that still fail, or fail permanently (5xx), go
+    to the `dead_letters` list. `counters` counts sent, retried and dropped
+    messages.
+
+    To test against a local stand-in (aiosmtpd, `python -m smtpd -n -c
+    DebuggingServer`), use host="localhost", use_tls=False and no username.
+    """
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True, size=2, timeout=30, rate=None, burst=1,
+                 max_retries=4, retry_base=2.0, retry_cap=60.0, dead_letter_limit=1000):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.limiter = account_bucket(host, username, rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.retry_base = retry_base  # seconds before the first retry, doubled for each one after
+        self.retry_cap = retry_cap
+        self.dead_letters = deque(maxlen=dead_letter_limit)  # dicts describing messages given up on, oldest first
+        self.counters = {"sent": 0, "retried": 0, "dropped": 0}
+        self._counter_lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open and authenticate a new SMTP session."""
+        # Imported here because smtplib pulls in ssl and email, which startup doesn't need
+        import smtplib
+
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        return server
+
+    def acquire(self):
+        """Borrow a session, reusing an idle one if there is one."""
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, server, broken=False):
+        """Return a borrowed session. Broken sessions are closed instead of kept."""
+        if broken or server is None:
+            self._discard(server)
+        else:
+            self._idle.put(server)
+        self._slots.release()
+
+    def send(self, from_addr, to_addrs, message):
+        """Send one message. Returns None on success or the exception on failure."""
+        return self.send_batch([(from_addr, to_addrs, message)])[0]
+
+    def send_batch(self, messages):
+        """Send (from_addr, to_addrs, message) tuples over at most `size` sessions.
+
+        Messages failing with a transient error are retried together after
+        a backoff. Returns a list parallel to `messages` holding None for
+        each delivered message and the final exception for each failed one.
+        """
+        results = [None] * len(messages)
+        positions = list(range(len(messages)))
+        attempt = 0
+        while positions:
+            self._send_positions(messages, positions, results)
+            positions = [pos for pos in positions if results[pos] is not None and is_transient(results[pos])]
+            if not positions or attempt >= self.max_retries:
+                break
+            self._count("retried", len(positions))
+            time.sleep(backoff_delay(attempt, self.retry_base, self.retry_cap))
+            attempt += 1
+        self._count("sent", results.count(None))
+        failed = [(message, error) for message, error in zip(messages, results) if error is not None]
+        self.give_up([message for message, _ in failed], [error for _, error in failed])
+        return results
+
+    def give_up(self, messages, errors):
+        """Count (from_addr, to_addrs, message) tuples as dropped and keep them in dead_letters with their errors."""
+        failed_at = datetime.now().isoformat()
+        for (from_addr, to_addrs, message), error in zip(messages, errors):
+            self._count("dropped")
+            self.dead_letters.append({"failed_at": failed_at, "from": from_addr, "to": to_addrs, "error": str(error),
+                                      "transient": isinstance(error, Exception) and is_transient(error),
+                                      "message": message})
+
+    def stats(self):
+        """Snapshot of the sent/retried/dropped counters and the dead-letter count."""
+        with self._counter_lock:
+            return dict(self.counters, dead_letters=len(self.dead_letters))
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            self.counters[name] += amount
+
+    def _send_positions(self, messages, positions, results):
+        """Send the messages at `positions`, split across at most `size` sessions."""
+        chunks = [positions[i::self.size] for i in range(min(self.size, len(positions)))]
+        if len(chunks) == 1:
+            self._send_chunk(messages, chunks[0], results)
+        else:
+            futures = [self._get_executor().submit(self._send_chunk, messages, chunk, results) for chunk in chunks]
+            for future in futures:
+                future.result()
+
+    def close(self):
+        """Quit every idle session and stop the batch workers."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp")
+            return self._executor
+
+    def _send_chunk(self, messages, positions, results):
+        try:
+            server = self.acquire()
+        except Exception as e:
+            for pos in positions:
+                results[pos] = e
+            return
+        for n, pos in enumerate(positions):
+            from_addr, to_addrs, message = messages[pos]
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server = self.connect()
+                    if self.limiter is not None:
+                        self.limiter.acquire()
+                    server.sendmail(from_addr, to_addrs, message)
+                    results[pos] = None
+                    break
+                except Exception as e:
+                    results[pos] = e
+                    if not is_connection_error(e):
+                        break
+                    # Session dropped (idle timeout, server restart): reconnect once and retry
+                    self._discard(server)
+                    server = None
+            if server is None:
+                # Could not get a working session back; fail the rest of this chunk
+                for rest in positions[n + 1:]:
+                    results[rest] = results[pos]
+                break
+        self.release(server)
+
+    def _discard(self, server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+class DeliveryQueue:
+    """Bounded hand-off between the reminder scheduler and delivery workers.
+
+    submit() only enqueues. Worker threads take up to `batch_size` queued items
+    at a time and pass them to `handler` as one list. When the queue is full,
+    submit() blocks for up to `put_timeout` seconds (backpressure) and then
+    rejects the item. An item still queued after `timeout` seconds is dropped
+    as expired and passed to `on_expired` as a list, if given. The pool's
+    socket timeout bounds the send itself.
+
+    If the handler is limited to `rate` items per second, time spent waiting
+    for that is not held against an item: its deadline is extended by the
+    backlog ahead of it divided by `rate`, and submit() waits as long as the
+    workers need to finish their batches at that rate.
+    """
+
+    def __init__(self, handler, workers=2, maxsize=1000, timeout=60, put_timeout=5, batch_size=50, on_expired=None,
+                 rate=None):
+        self.handler = handler
+        self.on_expired = on_expired
+        self.timeout = timeout
+        self.rate = rate
+        self.batch_size = batch_size
+        # The items in the workers' hands are ahead of everything queued
+        self.in_flight = workers * batch_size
+        self.put_timeout = put_timeout + (self.in_flight / rate if rate else 0)
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "rejected": 0, "expired": 0, "handled": 0, "errors": 0}
+        self.max_depth = 0
+        self._workers = [threading.Thread(target=self._work, name=f"delivery-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def depth(self):
+        """Number of items waiting for a worker."""
+        return self._queue.qsize()
+
+    def stats(self):
+        """Snapshot of the queue depth metrics and counters."""
+        with self._lock:
+            return dict(self.counters, depth=self.depth, max_depth=self.max_depth)
+
+    def submit(self, item):
+        """Queue one item for delivery. Returns False if the queue stayed full."""
+        deadline = time.monotonic() + self.timeout
+        if self.rate:
+            deadline += (self._queue.qsize() + self.in_flight) / self.rate
+        try:
+            self._queue.put((deadline, item), timeout=self.put_timeout)
+        except queue.Full:
+            self._count("rejected")
+            return False
+        with self._lock:
+            self.counters["submitted"] += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def join(self):
+        """Block until every queued item has been handled."""
+        self._queue.join()
+
+    def stop(self):
+        """Ask the workers to exit once they reach the end of the queue."""
+        for _ in self._workers:
+            self._queue.put((None, None))
+
+    def _work(self):
+        while True:
+            jobs = [self._queue.get()]
+            # Stop draining at a stop marker so each worker consumes exactly one
+            while len(jobs) < self.batch_size and jobs[-1][0] is not None:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(deadline is None for deadline, _ in jobs)
+            now = time.monotonic()
+            batch = [item for deadline, item in jobs if deadline is not None and deadline >= now]
+            expired = [item for deadline, item in jobs if deadline is not None and deadline < now]
+            self._count("expired", len(expired))
+            if expired and self.on_expired is not None:
+                try:
+                    self.on_expired(expired)
+                except Exception as e:
+                    print(f"Failed to record expired deliveries: {e}")
+            try:
+                if batch:
+                    self.handler(batch)
+                    self._count("handled", len(batch))
+            except Exception as e:
+                self._count("errors", len(batch))
+                print(f"Delivery worker failed: {e}")
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _count(self, name, amount=1):
+        if amount:
+            with self._lock:
+                self.counters[name] += amount
@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+import threading
+from datetime import datetime
+from itertools import islice
+
+EXPORT_COLUMNS = ["Year", "Month", "Day", "Start Hour", "End Hour", "Name", "Email", "Description"]
+
+# How many rows are written between progress callbacks
+PROGRESS_EVERY = 1000
+
+
+# Function to turn (date, event) pairs into export rows, one at a time
+def event_rows(events):
+    for date, event in events:
+        yield [date[0], date[1], date[2], event.start_hour, event.end_hour, event.name, event.email, event.description]
+
+
+def export_excel(events, path, progress=None, total=None):
+    """Write (date, event) pairs to an Excel file with openpyxl's write-only mode.
+
+    Rows go straight to the file as they arrive, so memory use stays flat
+    however many events there are. `progress(done, total)` is called every
+    PROGRESS_EVERY rows and once at the end. Returns the number of rows written.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Schedule")
+    sheet.append(EXPORT_COLUMNS)
+    count = 0
+    try:
+        for row in event_rows(events):
+            sheet.append(row)
+            count += 1
+            if progress is not None and count % PROGRESS_EVERY == 0:
+                progress(count, total)
+    except BaseException:
+        sheet.close()  # finish the sheet's temporary file instead of leaving it to the garbage collector
+        raise
+    workbook.save(path)
+    if progress is not None:
+        progress(count, total)
+    return count
+
+
+# Columns of the machine-oriented formats (CSV, JSON Lines, Parquet, Arrow)
+RECORD_COLUMNS = ["event_id", "date", "start_hour", "end_hour", "name", "email", "description", "updated_at"]
+
+# Rows buffered per write for the machine-oriented formats (one Parquet row group per chunk)
+CHUNK_SIZE = 50000
+
+
+# Function to turn (date, event) pairs into flat records for the machine-oriented formats
+def event_records(events):
+    for date, event in events:
+        yield (event.event_id, "%04d-%02d-%02d" % date, event.start_hour, event.end_hour, event.name, event.email,
+               event.description, event.updated_at.isoformat() if event.updated_at else None)
+
+
+# Function to group an iterable into lists of at most `size` items
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_csv(events, path, progress=None, total=None):
+    """Write (date, event) pairs to a CSV file one chunk at a time. Returns the row count."""
+    count = 0
+    with open(path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(RECORD_COLUMNS)
+        for chunk in chunked(event_records(events)):
+            writer.writerows(chunk)
+            count += len(chunk)
+            if progress is not None:
+                progress(count, total)
+    return count
+
+
+def export_jsonl(events, path, progress=None, total=None):
+    """Write (date, event) pairs as JSON Lines, one object per event. Returns the row count."""
+    count = 0
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    with open(path, mode='w', encoding='utf-8') as f:
+        for chunk in chunked(event_records(events)):
+            f.write("".join(encode(dict(zip(RECORD_COLUMNS, record))) + "\n" for record in chunk))
+            count += len(chunk)
+            if progress is not None:
+                progress(count, total)
+    return count
+
+
+def export_columnar(events, path, file_format="parquet", progress=None, total=None):
+    """Write (date, event) pairs to a Parquet or Arrow IPC file, one record batch per chunk.
+
+    Needs pyarrow; raises ImportError when it is not installed. Returns the row count.
+    """
+    import pyarrow as pa
+
+    schema = pa.schema([("event_id", pa.string()), ("date", pa.string()), ("start_hour", pa.int16()),
+                        ("end_hour", pa.int16()), ("name", pa.string()), ("email", pa.string()),
+                        ("description", pa.string()), ("updated_at", pa.string())])
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    count = 0
+    try:
+        for chunk in chunked(event_records(events)):
+            columns = [list(column) for column in zip(*chunk)]
+            writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+            count += len(chunk)
+            if progress is not None:
+                progress(count, total)
+    finally:
+        writer.close()
+    return count
+
+
+# Serializes read-modify-write of the watermark file between concurrent exports
+WATERMARK_LOCK = threading.Lock()
+
+
+# Function to read when a file was last exported (for "since last export" mode)
+def read_watermark(state_path, key):
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding='utf-8') as f:
+        value = json.load(f).get(key)
+    return datetime.fromisoformat(value) if value else None
+
+
+# Function to record when a file was last exported
+def write_watermark(state_path, key, moment):
+    with WATERMARK_LOCK:
+        state = {}
+        if os.path.exists(state_path):
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        state[key] = moment.isoformat()
+        with open(state_path + ".tmp", mode='w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(state_path + ".tmp", state_path)
@@ -0,0 +1,302 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+from datetime import date as Date, datetime, timedelta
+
+# The grid scrolls through this many weeks either side of the week it opens on
+VIRTUAL_WEEKS = 520
+
+# Sizes in pixels
+MONTH_ROW_HEIGHT = 110  # one week in month view
+HOUR_HEIGHT = 36  # one hour in week view
+HEADER_HEIGHT = 24
+HOUR_GUTTER = 44  # hour labels on the left of week view
+LINE_HEIGHT = 15
+
+# How often edits reported by the ScheduleBuilder are redrawn, in milliseconds
+POLL_MS = 100
+
+# Overlapping events shown side by side in one hour of week view before "+N" is shown instead
+MAX_COLUMNS = 3
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class CalendarGrid(tk.Frame):
+    """A scrollable week or month grid over a ScheduleBuilder.
+
+    The grid is a virtual strip of weeks, and only the weeks inside the
+    window are drawn. Events for the visible days are fetched with one
+    events_between() call for the days not already cached, and days that
+    scroll out of view are dropped from the cache. The builder's change
+    listener only records which dates were edited; a poll on the Tk thread
+    then redraws those days if they are on screen.
+    """
+
+    def __init__(self, master, builder, mode="month", on_day=None):
+        super().__init__(master)
+        self.builder = builder
+        self.mode = mode
+        self.on_day = on_day  # called with a date when a day is clicked
+        today = Date.today()
+        self.origin = today - timedelta(days=today.weekday(), weeks=VIRTUAL_WEEKS)  # Monday of the first virtual week
+        self.offset = 0  # pixels scrolled from the top of the strip
+        self.days = {}  # date -> that day's events, for visible days only
+        self.cells = {}  # date -> (x, y, width, height) of its cell on the canvas
+        self._dirty = set()
+        self._dirty_all = False
+        self._dirty_lock = threading.Lock()
+
+        toolbar = tk.Frame(self)
+        toolbar.pack(side="top", fill="x")
+        tk.Button(toolbar, text="<", command=lambda: self.scroll_weeks(-1)).pack(side="left")
+        tk.Button(toolbar, text="Today", command=self.show_today).pack(side="left")
+        tk.Button(toolbar, text=">", command=lambda: self.scroll_weeks(1)).pack(side="left")
+        self.mode_var = tk.StringVar(value=mode)
+        tk.Radiobutton(toolbar, text="Month", variable=self.mode_var, value="month",
+                       command=lambda: self.set_mode("month")).pack(side="right")
+        tk.Radiobutton(toolbar, text="Week", variable=self.mode_var, value="week",
+                       command=lambda: self.set_mode("week")).pack(side="right")
+        self.title = tk.Label(toolbar, font=('Helvetica', 12))
+        self.title.pack(side="left", padx=10)
+
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda event: self.yview("scroll", -1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+        self.canvas.bind("<Button-1>", self._click)
+        self.bind("<Destroy>", self._on_destroy)
+
+        self.builder.add_listener(self._on_change)
+        self.show_today()
+        self._poll_id = self.after(POLL_MS, self._poll)
+
+    def row_height(self):
+        return MONTH_ROW_HEIGHT if self.mode == "month" else 24 * HOUR_HEIGHT
+
+    def total_height(self):
+        return 2 * VIRTUAL_WEEKS * self.row_height()
+
+    def view_height(self):
+        return max(1, self.canvas.winfo_height() - HEADER_HEIGHT)
+
+    def show_today(self):
+        """Scroll to the current week (to 8:00 in week view)."""
+        self.offset = VIRTUAL_WEEKS * self.row_height() + (8 * HOUR_HEIGHT if self.mode == "week" else 0)
+        self.redraw()
+
+    def scroll_weeks(self, weeks):
+        self.scroll_to(self.offset + weeks * self.row_height())
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, self.total_height() - self.view_height()))
+        self.redraw()
+
+    def set_mode(self, mode):
+        """Switch between "week" and "month", keeping the week at the top of the window."""
+        week = int(self.offset // self.row_height())
+        self.mode = mode
+        self.days.clear()
+        self.scroll_to(week * self.row_height() + (8 * HOUR_HEIGHT if mode == "week" else 0))
+
+    def yview(self, *args):
+        """Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units" | "pages")."""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total_height())
+        elif args[0] == "scroll":
+            step = self.view_height() if args[2] == "pages" else (HOUR_HEIGHT if self.mode == "week" else MONTH_ROW_HEIGHT // 4)
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def redraw(self):
+        """Draw the visible weeks, fetching events only for days not already cached."""
+        canvas = self.canvas
+        canvas.delete("all")
+        self.cells = {}
+        width = max(1, canvas.winfo_width())
+        gutter = HOUR_GUTTER if self.mode == "week" else 0
+        column = (width - gutter) / 7
+        row_height = self.row_height()
+        first_week = int(self.offset // row_height)
+        last_week = int((self.offset + self.view_height()) // row_height)
+        first_day = self.origin + timedelta(weeks=first_week)
+        self._fetch(first_day, self.origin + timedelta(weeks=last_week + 1))
+
+        for week in range(first_week, last_week + 1):
+            top = HEADER_HEIGHT + week * row_height - self.offset
+            for weekday in range(7):
+                day = self.origin + timedelta(weeks=week, days=weekday)
+                self.cells[day] = (gutter + weekday * column, top, column, row_height)
+                self._draw_day(day)
+            if self.mode == "week":
+                self._draw_hour_labels(top)
+
+        # Header, drawn last so it stays above the scrolled cells
+        canvas.create_rectangle(0, 0, width, HEADER_HEIGHT, fill="#e8e8e8", outline="", tags="header")
+        for weekday, name in enumerate(DAY_NAMES):
+            label = name
+            if self.mode == "week":
+                day = self.origin + timedelta(weeks=int((self.offset + self.view_height() / 2) // row_height), days=weekday)
+                label = f"{name} {day.month}/{day.day}"
+            canvas.create_text(gutter + (weekday + 0.5) * column, HEADER_HEIGHT / 2, text=label, tags="header")
+        middle = self.origin + timedelta(weeks=int((self.offset + self.view_height() / 2) // row_height))
+        self.title.config(text=middle.strftime("%B %Y"))
+        total = self.total_height()
+        self.scrollbar.set(self.offset / total, (self.offset + self.view_height()) / total)
+
+    def _fetch(self, first_day, end_day):
+        """Keep only the days in [first_day, end_day) cached, loading the missing ones with one query."""
+        for day in [day for day in self.days if not first_day <= day < end_day]:
+            del self.days[day]
+        self._load([first_day + timedelta(days=i) for i in range((end_day - first_day).days)
+                    if first_day + timedelta(days=i) not in self.days])
+
+    def _load(self, missing):
+        """Cache the events of the sorted dates in `missing` with one events_between() call spanning them."""
+        if not missing:
+            return
+        wanted = set(missing)
+        for day in missing:
+            self.days[day] = []
+        start = datetime(missing[0].year, missing[0].month, missing[0].day)
+        end = datetime(missing[-1].year, missing[-1].month, missing[-1].day) + timedelta(days=1)
+        for event in self.builder.events_between(start, end):
+            day = event.date_time.date()
+            if day in wanted:
+                self.days[day].append(event)
+
+    def _draw_day(self, day):
+        """Draw (or redraw) one day's cell."""
+        tag = f"day{day.toordinal()}"
+        self.canvas.delete(tag)
+        x, y, width, height = self.cells[day]
+        if self.mode == "month":
+            self._draw_month_cell(day, tag, x, y, width, height)
+        else:
+            self._draw_week_column(day, tag, x, y, width)
+
+    def _draw_month_cell(self, day, tag, x, y, width, height):
+        canvas = self.canvas
+        fill = "#fff8d0" if day == Date.today() else ("white" if day.month % 2 else "#f6f6f6")
+        canvas.create_rectangle(x, y, x + width, y + height, fill=fill, outline="#cccccc", tags=tag)
+        label = day.strftime("%b %d") if day.day == 1 else str(day.day)
+        canvas.create_text(x + 4, y + 2, text=label, anchor="nw", font=('Helvetica', 9, 'bold'), tags=tag)
+        events = self.days.get(day, [])
+        fits = max(0, int((height - LINE_HEIGHT - 4) // LINE_HEIGHT))
+        shown = events if len(events) <= fits else events[:max(0, fits - 1)]
+        chars = max(1, int(width // 6))
+        for i, event in enumerate(shown):
+            text = f"{event.start_hour}:00 {event.name}"
+            canvas.create_text(x + 4, y + LINE_HEIGHT + 2 + i * LINE_HEIGHT, text=text[:chars], anchor="nw",
+                               font=('Helvetica', 8), tags=tag)
+        if len(shown) < len(events):
+            canvas.create_text(x + 4, y + LINE_HEIGHT + 2 + len(shown) * LINE_HEIGHT, text=f"+{len(events) - len(shown)} more",
+                               anchor="nw", font=('Helvetica', 8, 'italic'), fill="#555555", tags=tag)
+
+    def _draw_week_column(self, day, tag, x, y, width):
+        canvas = self.canvas
+        bottom = HEADER_HEIGHT + self.view_height()
+        # Only the hours inside the window are drawn
+        first_hour = max(0, int((HEADER_HEIGHT - y) // HOUR_HEIGHT))
+        last_hour = min(23, int((bottom - y) // HOUR_HEIGHT))
+        fill = "#fff8d0" if day == Date.today() else "white"
+        canvas.create_rectangle(x, y + first_hour * HOUR_HEIGHT, x + width, y + (last_hour + 1) * HOUR_HEIGHT,
+                                fill=fill, outline="#cccccc", tags=tag)
+        for hour in range(first_hour, last_hour + 1):
+            canvas.create_line(x, y + hour * HOUR_HEIGHT, x + width, y + hour * HOUR_HEIGHT, fill="#eeeeee", tags=tag)
+
+        # Greedy column layout: each event takes the first column free at its start
+        column_ends = []
+        hidden = {}  # hour -> events that did not get a column
+        column_width = width / MAX_COLUMNS
+        chars = max(1, int(column_width // 6))
+        for event in sorted(self.days.get(day, []), key=lambda event: (event.start_hour, -event.end_hour)):
+            for column, end in enumerate(column_ends):
+                if end <= event.start_hour:
+                    column_ends[column] = event.end_hour
+                    break
+            else:
+                column = len(column_ends)
+                if column >= MAX_COLUMNS:
+                    hidden[event.start_hour] = hidden.get(event.start_hour, 0) + 1
+                    continue
+                column_ends.append(event.end_hour)
+            if event.end_hour <= first_hour or event.start_hour > last_hour:
+                continue
+            left = x + column * column_width
+            canvas.create_rectangle(left + 1, y + event.start_hour * HOUR_HEIGHT + 1, left + column_width - 1,
+                                    y + event.end_hour * HOUR_HEIGHT - 1, fill="#cfe2ff", outline="#6699cc", tags=tag)
+            canvas.create_text(left + 3, y + event.start_hour * HOUR_HEIGHT + 2, text=event.name[:chars], anchor="nw",
+                               font=('Helvetica', 8), tags=tag)
+        for hour, count in hidden.items():
+            if first_hour <= hour <= last_hour:
+                canvas.create_text(x + width - 2, y + hour * HOUR_HEIGHT + 2, text=f"+{count}", anchor="ne",
+                                   font=('Helvetica', 8, 'bold'), fill="#aa0000", tags=tag)
+        canvas.tag_raise("header")
+
+    def _draw_hour_labels(self, top):
+        for hour in range(24):
+            y = top + hour * HOUR_HEIGHT
+            if HEADER_HEIGHT - HOUR_HEIGHT <= y <= HEADER_HEIGHT + self.view_height():
+                self.canvas.create_text(HOUR_GUTTER - 4, y + 2, text=f"{hour}:00", anchor="ne", font=('Helvetica', 8))
+
+    def _click(self, event):
+        if self.on_day is None or event.y < HEADER_HEIGHT:
+            return
+        for day, (x, y, width, height) in self.cells.items():
+            if x <= event.x < x + width and y <= event.y < y + height:
+                self.on_day(day)
+                return
+
+    def _on_change(self, dates):
+        # May run on any thread: only record what changed, the Tk thread redraws in _poll()
+        with self._dirty_lock:
+            if dates is None:
+                self._dirty_all = True
+            else:
+                self._dirty.update(dates)
+
+    def _poll(self):
+        with self._dirty_lock:
+            dirty, dirty_all = self._dirty, self._dirty_all
+            self._dirty, self._dirty_all = set(), False
+        if dirty_all:
+            self.days.clear()
+            self.redraw()
+        else:
+            for day in dirty:
+                if day in self.cells:
+                    self.days.pop(day, None)
+                    self._load([day])
+                    self._draw_day(day)
+        self._poll_id = self.after(POLL_MS, self._poll)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.after_cancel(self._poll_id)
+            self.builder.remove_listener(self._on_change)
+
+
+def show_day(master, builder, day):
+    """Open a window listing every event on one date in a scrollable table.
+
+    Rows come from builder.rendered_day(), so the window and the Word export
+    share one cached rendering of the day.
+    """
+    window = tk.Toplevel(master)
+    window.title(f"Schedule for {day.month}/{day.day}/{day.year}")
+    columns = ("event", "description")
+    tree = ttk.Treeview(window, columns=columns, show="headings")
+    for column, heading, width in zip(columns, ("Event", "Description"), (420, 240)):
+        tree.heading(column, text=heading)
+        tree.column(column, width=width)
+    scrollbar = ttk.Scrollbar(window, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side="right", fill="y")
+    tree.pack(side="left", fill="both", expand=True)
+    for line, description in builder.rendered_day(day):
+        tree.insert("", "end", values=(line, description))
+    return window
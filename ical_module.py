@@ -0,0 +1,251 @@
+from datetime import datetime, timedelta, timezone
+
+from export_module import PROGRESS_EVERY
+from recurrence_module import parse_ical_datetime
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+# RFC 5545 recommends folding content lines longer than 75 octets
+FOLD_LENGTH = 75
+
+
+# Function to yield unfolded content lines from a file, one at a time
+def unfold_lines(f):
+    current = None
+    for line in f:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+# RRULE weekday codes, Monday first as in date.weekday()
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+# Properties of a VEVENT that are mapped onto events; everything else is skipped unparsed
+WANTED_PROPERTIES = {"DTSTART", "DTEND", "DURATION", "SUMMARY", "DESCRIPTION", "ORGANIZER", "ATTENDEE", "RRULE", "EXDATE"}
+
+
+# Function to split "NAME;PARAM=VALUE:text" into (NAME, {PARAM: VALUE}, text)
+def parse_line(line):
+    head, _, value = line.partition(":")
+    if '"' in head:
+        # A quoted parameter value may itself contain ':'
+        head, value = split_quoted(line)
+    name, *params = head.split(";")
+    return name.upper(), dict(param.split("=", 1) for param in params if "=" in param), value
+
+
+# Function to find the name/value separator of a line whose parameters contain quoted strings
+def split_quoted(line):
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            return line[:i], line[i + 1:]
+    return line, ""
+
+
+# Function to undo iCalendar TEXT escaping
+def unescape_text(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+
+# Function to apply iCalendar TEXT escaping
+def escape_text(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+# Function to parse a DATE or DATE-TIME value into a naive local datetime
+def parse_datetime(value, params):
+    value = value.strip()
+    moment = parse_ical_datetime(value)
+    if params.get("VALUE") == "DATE" or "T" not in value:
+        return moment, True
+    if value.endswith("Z"):
+        return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None), False
+    if "TZID" in params and ZoneInfo is not None:
+        try:
+            return moment.replace(tzinfo=ZoneInfo(params["TZID"].strip('"'))).astimezone().replace(tzinfo=None), False
+        except Exception:
+            pass  # unknown zone: treat the time as local
+    return moment, False
+
+
+# Function to drop a BYDAY that only repeats DTSTART's weekday, which calendar apps write on every weekly rule
+def weekly_rrule(rrule, start):
+    parts = rrule.split(";")
+    weekday = "BYDAY=" + WEEKDAYS[start.weekday()]
+    if "FREQ=WEEKLY" in (part.upper() for part in parts):
+        parts = [part for part in parts if part.upper() != weekday]
+    return ";".join(parts)
+
+
+# Function to turn one VEVENT's properties into a bulk_load row
+def event_row(properties, default_email):
+    _, params, value = properties["DTSTART"]
+    start, all_day = parse_datetime(value, params)
+    if "DTEND" in properties:
+        _, end_params, end_value = properties["DTEND"]
+        end, _ = parse_datetime(end_value, end_params)
+    elif "DURATION" in properties:
+        end = start + parse_duration(properties["DURATION"][2])
+    else:
+        end = start + (timedelta(days=1) if all_day else timedelta(hours=1))
+    # The schedule works in whole hours within one day
+    end_hour = 24 if end.date() > start.date() else end.hour + (1 if end.minute or end.second else 0)
+    email = default_email
+    for key in ("ORGANIZER", "ATTENDEE"):
+        if key in properties and properties[key][2].lower().startswith("mailto:"):
+            email = properties[key][2][7:]
+            break
+    row = {
+        "year": start.year, "month": start.month, "day": start.day,
+        "start_hour": start.hour, "end_hour": max(end_hour, start.hour + 1),
+        "name": unescape_text(properties.get("SUMMARY", ("", {}, "(no title)"))[2]),
+        "email": email,
+        "description": unescape_text(properties.get("DESCRIPTION", ("", {}, ""))[2]),
+    }
+    if "RRULE" in properties:
+        row["rrule"] = weekly_rrule(properties["RRULE"][2], start)
+    if "EXDATE" in properties:
+        exdates = (parse_datetime(part, exdate_params) for _, exdate_params, exdate_value in properties["EXDATE"]
+                   for part in exdate_value.split(",") if part)
+        # A DATE exdate removes that day's occurrence, whatever its start time
+        row["exdates"] = [exdate.replace(hour=start.hour) if is_date else exdate for exdate, is_date in exdates]
+    return row
+
+
+# Function to parse an iCalendar DURATION such as PT1H30M or P1D
+def parse_duration(value):
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-").lstrip("P")
+    days = hours = minutes = seconds = 0
+    number = ""
+    in_time = False
+    for char in value:
+        if char.isdigit():
+            number += char
+        elif char == "T":
+            in_time = True
+        else:
+            amount = int(number or 0)
+            number = ""
+            if char == "W":
+                days += 7 * amount
+            elif char == "D":
+                days += amount
+            elif char == "H" and in_time:
+                hours += amount
+            elif char == "M" and in_time:
+                minutes += amount
+            elif char == "S" and in_time:
+                seconds += amount
+    return sign * timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def read_ics_rows(path, default_email="", errors=None):
+    """Stream VEVENTs from an .ics file as bulk_load rows.
+
+    The file is read one line at a time and only the current VEVENT's
+    properties are held, so memory does not grow with the feed's size.
+    Events that can't be mapped are skipped and, if `errors` is a list,
+    reported there as (line_number, message).
+    """
+    with open(path, mode='r', encoding='utf-8', newline='') as f:
+        properties = None
+        depth = 0  # nesting inside the current VEVENT (VALARM etc.)
+        for number, line in enumerate(unfold_lines(f), 1):
+            if not line:
+                continue
+            # Only the property name is read here; parse_line() runs just for WANTED_PROPERTIES
+            name, _, value = line.partition(":")
+            if ";" in name:
+                name = name.partition(";")[0]
+            name = name.upper()
+            if name == "BEGIN" or name == "END":
+                value = value.strip().upper()
+            if name == "BEGIN":
+                if value == "VEVENT" and properties is None:
+                    properties = {}
+                elif properties is not None:
+                    depth += 1
+            elif name == "END":
+                if properties is not None and depth:
+                    depth -= 1
+                elif properties is not None and value == "VEVENT":
+                    try:
+                        yield event_row(properties, default_email)
+                    except (KeyError, ValueError) as e:
+                        if errors is not None:
+                            errors.append((number, f"skipped VEVENT: {e}"))
+                    properties = None
+            elif properties is not None and not depth and name == "EXDATE":
+                # Calendar apps write one EXDATE line per cancelled occurrence
+                properties.setdefault(name, []).append(parse_line(line))
+            elif properties is not None and not depth and name in WANTED_PROPERTIES and name not in properties:
+                properties[name] = parse_line(line)
+
+
+# Function to fold a content line to FOLD_LENGTH octets
+def fold_line(line):
+    encoded = line.encode("utf-8")
+    if len(encoded) <= FOLD_LENGTH:
+        return line + "\r\n"
+    parts = []
+    limit = FOLD_LENGTH
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1  # never split a UTF-8 sequence
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = FOLD_LENGTH - 1  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def write_ics(events, path, progress=None, total=None):
+    """Write events to an .ics file one VEVENT at a time. Returns how many were written.
+
+    Recurring series are written once, with an RRULE and their EXDATEs,
+    rather than as one VEVENT per occurrence.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    count = 0
+    with open(path, mode='w', encoding='utf-8', newline='') as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Hackathon 2024//Schedule Manager//EN\r\n")
+        for event in events:
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:{event.event_id}@schedule-manager",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{event.date_time.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND:{event.end_time.strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:{escape_text(event.name)}",
+                f"ORGANIZER:mailto:{event.email}",
+            ]
+            if event.description:
+                lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+            if event.rule is not None:
+                lines.append(f"RRULE:{event.rule.to_rrule()}")
+                if event.rule.exdates:
+                    lines.append("EXDATE:" + ",".join(start.strftime('%Y%m%dT%H%M%S') for start in sorted(event.rule.exdates)))
+            lines.append("END:VEVENT")
+            f.write("".join(fold_line(line) for line in lines))
+            count += 1
+            if progress is not None and count % PROGRESS_EVERY == 0:
+                progress(count, total)
+        f.write("END:VCALENDAR\r\n")
+    if progress is not None:
+        progress(count, total)
+    return count
@@ -0,0 +1,74 @@
+import bisect
+from datetime import timedelta
+
+
+class EventIndex:
+    """Sorted index over event start/end times for range and overlap lookups.
+
+    Events are kept in an array sorted by (start, seq). Range queries are two
+    bisects plus a slice. Overlap queries also bisect, starting from
+    `start - max_duration`, because no event can reach further back than the
+    longest one seen.
+    """
+
+    def __init__(self):
+        self._keys = []      # sorted (start, seq) tuples
+        self._events = []    # events, parallel to self._keys
+        self._key_of = {}    # event -> its (start, seq) key
+        self._seq = 0
+        self.max_duration = timedelta(0)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, event):
+        return event in self._key_of
+
+    def add(self, event):
+        """Insert an event using its date_time and end_time."""
+        self._seq += 1
+        key = (event.date_time, self._seq)
+        pos = bisect.bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self._events.insert(pos, event)
+        self._key_of[event] = key
+        duration = event.end_time - event.date_time
+        if duration > self.max_duration:
+            self.max_duration = duration
+
+    def add_many(self, events):
+        """Insert many events with one sort instead of one array insert per event."""
+        rows = list(zip(self._keys, self._events))
+        for event in events:
+            self._seq += 1
+            key = (event.date_time, self._seq)
+            rows.append((key, event))
+            self._key_of[event] = key
+            duration = event.end_time - event.date_time
+            if duration > self.max_duration:
+                self.max_duration = duration
+        rows.sort(key=lambda row: row[0])
+        self._keys = [key for key, _ in rows]
+        self._events = [event for _, event in rows]
+
+    def remove(self, event):
+        """Remove an event. Returns False if it was not indexed."""
+        key = self._key_of.pop(event, None)
+        if key is None:
+            return False
+        pos = bisect.bisect_left(self._keys, key)
+        del self._keys[pos]
+        del self._events[pos]
+        return True
+
+    def events_between(self, start, end):
+        """Events starting in [start, end), ordered by start time."""
+        lo = bisect.bisect_left(self._keys, (start,))
+        hi = bisect.bisect_left(self._keys, (end,))
+        return self._events[lo:hi]
+
+    def overlapping(self, start, end):
+        """Events whose [date_time, end_time) intersects [start, end)."""
+        lo = bisect.bisect_left(self._keys, (start - self.max_duration,))
+        hi = bisect.bisect_left(self._keys, (end,))
+        return [event for event in self._events[lo:hi] if event.end_time > start]
@@ -0,0 +1,154 @@
+import os
+import sys
+import threading
+import time
+
+# Reminders arriving within this many seconds of the first one share one alert
+COALESCE_SECONDS = 2.0
+
+# Reminders listed by name in one alert; the rest are counted
+MAX_LISTED = 5
+
+# Seconds a sound player or notification command may run
+COMMAND_TIMEOUT = 10
+
+# (player, sound file) pairs tried in order where winsound is not available
+SOUND_PLAYERS = [
+    ("afplay", "/System/Library/Sounds/Glass.aiff"),
+    ("paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"),
+    ("aplay", "/usr/share/sounds/alsa/Front_Center.wav"),
+]
+
+
+class LogNotifier:
+    """Prints alerts; for servers and terminals with no one listening for a sound."""
+
+    name = "log"
+
+    def available(self):
+        return True
+
+    def alert(self, title, message):
+        print(f"{title}: {message}")
+
+
+class SoundNotifier:
+    """Beeps with winsound on Windows, a system sound player elsewhere, or the terminal bell."""
+
+    name = "sound"
+
+    def __init__(self, frequency=440, duration=1000):
+        self.frequency = frequency  # Hz
+        self.duration = duration  # milliseconds
+        self.player = None
+        if sys.platform != "win32":
+            import shutil
+            self.player = next(([player, path] for player, path in SOUND_PLAYERS
+                                if shutil.which(player) and os.path.exists(path)), None)
+
+    def available(self):
+        return True
+
+    def alert(self, title, message):
+        if sys.platform == "win32":
+            import winsound
+            winsound.Beep(self.frequency, self.duration)
+        elif self.player is not None:
+            import subprocess
+            subprocess.run(self.player, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT)
+        else:
+            sys.stdout.write("\a")
+            sys.stdout.flush()
+
+
+class DesktopNotifier:
+    """Shows a desktop notification with notify-send on Linux or osascript on macOS."""
+
+    name = "desktop"
+
+    def available(self):
+        # subprocess and shutil are imported here and in alert(), as they are only needed once alerts are sent
+        import shutil
+
+        if sys.platform == "darwin":
+            return shutil.which("osascript") is not None
+        return sys.platform.startswith("linux") and shutil.which("notify-send") is not None
+
+    def alert(self, title, message):
+        import subprocess
+
+        if sys.platform == "darwin":
+            quote = lambda text: '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            command = ["osascript", "-e", f"display notification {quote(message)} with title {quote(title)}"]
+        else:
+            command = ["notify-send", "--app-name=Schedule Manager", title, message]
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=COMMAND_TIMEOUT)
+
+
+BACKENDS = {"log": LogNotifier, "sound": SoundNotifier, "desktop": DesktopNotifier}
+
+
+class Notifier:
+    """Fire-and-forget reminder alerts through a set of backends, with bursts coalesced.
+
+    notify() only queues the message and returns. One background thread
+    waits `window` seconds after the first message of a burst, then sends
+    every message queued by then as a single alert to each backend, so 200
+    reminders due at once make one beep and one notification. Backends run
+    on that thread, so a slow sound or a hung notification command never
+    holds up email delivery.
+    """
+
+    def __init__(self, backends, window=COALESCE_SECONDS):
+        self.backends = [backend for backend in backends if backend.available()]
+        self.window = window
+        self.pending = []  # messages waiting for the current burst to close
+        self.alerts = 0  # alerts sent so far
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def notify(self, message):
+        """Queue one reminder message for the next alert."""
+        if not self.backends:
+            return
+        with self._cond:
+            self.pending.append(message)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self.pending:
+                    self._cond.wait()
+            time.sleep(self.window)  # let the rest of the burst arrive
+            with self._cond:
+                messages, self.pending = self.pending, []
+            self._alert(messages)
+
+    def _alert(self, messages):
+        title = "Reminder" if len(messages) == 1 else f"{len(messages)} reminders"
+        lines = messages[:MAX_LISTED]
+        if len(messages) > MAX_LISTED:
+            lines.append(f"... and {len(messages) - MAX_LISTED} more")
+        for backend in self.backends:
+            try:
+                backend.alert(title, "\n".join(lines))
+            except Exception as e:
+                print(f"Failed to show {backend.name} notification: {e}")
+        self.alerts += 1
+
+
+# Function to build a Notifier from backend names such as ["sound", "desktop"]; "none" or no names disables alerts
+def make_notifier(names, window=COALESCE_SECONDS):
+    backends = []
+    for name in names:
+        name = name.strip().lower()
+        if name in ("", "none"):
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown notifier backend: {name} (choose from {', '.join(BACKENDS)} or none)")
+        backends.append(BACKENDS[name]())
+    return Notifier(backends, window)
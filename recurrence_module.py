@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+# Days between occurrences for each supported FREQ value
+FREQUENCY_DAYS = {"DAILY": 1, "WEEKLY": 7}
+
+# RRULE parts from_rrule understands; WKST only matters together with BY* parts, which are rejected
+RRULE_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "WKST"}
+
+
+class RecurrenceRule:
+    """An RRULE-style repetition rule (DAILY or WEEKLY, INTERVAL, COUNT, UNTIL).
+
+    A recurring event is stored once as its first occurrence plus this rule.
+    Occurrences are computed with arithmetic only when a window asks for them.
+    Finding the first occurrence in a window is O(1), however long the series.
+    `exdates` holds start times of single occurrences that were deleted.
+    """
+
+    def __init__(self, freq="DAILY", interval=1, count=None, until=None, exdates=None):
+        freq = freq.upper()
+        if freq not in FREQUENCY_DAYS:
+            raise ValueError(f"Unsupported recurrence frequency: {freq}")
+        if interval < 1:
+            raise ValueError("Recurrence interval must be at least 1")
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.exdates = set(exdates or ())
+        self.step = timedelta(days=FREQUENCY_DAYS[freq] * interval)
+
+    @classmethod
+    def from_rrule(cls, text):
+        """Parse an RFC 5545 RRULE value such as 'FREQ=WEEKLY;INTERVAL=2;COUNT=10'.
+
+        Raises ValueError for parts the rule cannot represent (BYDAY,
+        BYMONTHDAY, BYSETPOS, ...), rather than repeating on the wrong days.
+        A UTC UNTIL is converted to local time, like DTSTART; a DATE UNTIL
+        includes that whole day.
+        """
+        parts = {}
+        for part in text.strip().removeprefix("RRULE:").split(";"):
+            if not part:
+                continue
+            name, separator, value = part.partition("=")
+            name = name.strip().upper()
+            if not separator:
+                raise ValueError(f"Invalid RRULE part: {part!r}")
+            if name not in RRULE_PARTS:
+                raise ValueError(f"Unsupported RRULE part: {name}")
+            parts[name] = value.strip()
+        until = parts.get("UNTIL")
+        if until:
+            moment = parse_ical_datetime(until)
+            if until.endswith("Z"):
+                until = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+            elif "T" not in until:
+                until = moment + timedelta(days=1, microseconds=-1)
+            else:
+                until = moment
+        return cls(freq=parts.get("FREQ", "DAILY"),
+                   interval=int(parts.get("INTERVAL", 1)),
+                   count=int(parts["COUNT"]) if "COUNT" in parts else None,
+                   until=until or None)
+
+    def to_rrule(self):
+        """Format the rule as an RFC 5545 RRULE value."""
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        return ";".join(parts)
+
+    def is_finite(self):
+        return self.count is not None or self.until is not None
+
+    def last_start(self, first_start):
+        """Start of the final occurrence, or None for an endless rule."""
+        if not self.is_finite():
+            return None
+        candidates = []
+        if self.count is not None:
+            candidates.append(first_start + self.step * (self.count - 1))
+        if self.until is not None:
+            candidates.append(first_start + self.step * ((self.until - first_start) // self.step))
+        return min(candidates)
+
+    def occurrences(self, first_start, window_start, window_end):
+        """Yield occurrence start times in [window_start, window_end), in order."""
+        # Index of the first occurrence at or after window_start: ceil((window_start - first) / step)
+        k = max(0, -((first_start - window_start) // self.step))
+        start = first_start + self.step * k
+        last = self.last_start(first_start)
+        while start < window_end and (last is None or start <= last):
+            if start not in self.exdates:
+                yield start
+            start += self.step
+
+    def next_after(self, first_start, moment):
+        """Start of the first occurrence strictly after `moment`, or None if the series has ended."""
+        k = max(0, (moment - first_start) // self.step + 1)
+        last = self.last_start(first_start)
+        start = first_start + self.step * k
+        while last is None or start <= last:
+            if start not in self.exdates:
+                return start
+            start += self.step
+        return None
+
+
+def parse_ical_datetime(text):
+    """Parse an iCalendar DATE or DATE-TIME value into a naive datetime."""
+    text = text.rstrip("Z")
+    # Sliced by hand: strptime dominates the cost of parsing large .ics files
+    if len(text) == 15 and text[8] == "T":
+        return datetime(int(text[:4]), int(text[4:6]), int(text[6:8]), int(text[9:11]), int(text[11:13]), int(text[13:]))
+    if len(text) == 8:
+        return datetime(int(text[:4]), int(text[4:6]), int(text[6:]))
+    raise ValueError(f"Invalid iCalendar date: {text!r}")
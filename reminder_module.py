@@ -0,0 +1,171 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime
+
+# Longest single wait, so a wall-clock change (DST, NTP step) is noticed eventually
+MAX_WAIT_SECONDS = 300
+
+# Heap entry layout: [fire_time, seq, event, message, active, key]
+FIRE_TIME, SEQ, EVENT, MESSAGE, ACTIVE, KEY = range(6)
+
+
+class ReminderQueue:
+    """One-shot reminders in a min-heap keyed by absolute fire time.
+
+    run() sleeps on a condition variable until the earliest deadline, so an
+    idle queue costs no CPU. When a reminder fires it is removed from the heap.
+    Cancelling a reminder only marks it inactive. Inactive entries are dropped
+    when they reach the top of the heap, or when they make up half of it.
+
+    If `refill` is given, run() calls it on start and then every
+    `refill_every` (a timedelta). The owner uses it to load upcoming events
+    from storage and queue their reminders.
+    """
+
+    def __init__(self, dispatch, refill=None, refill_every=None):
+        self.dispatch = dispatch  # called with a list of (event, message) pairs that are due
+        self.refill = refill
+        self.refill_every = refill_every
+        self._next_refill = None
+        self._heap = []
+        self._entries = {}  # cancellation key -> its live heap entries
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap) - self._cancelled
+
+    def add(self, fire_time, event, message, key=None):
+        """Queue a reminder for `event` at the datetime `fire_time`.
+
+        `key` groups reminders for cancel(); it defaults to the event itself.
+        """
+        key = event if key is None else key
+        entry = [fire_time, next(self._counter), event, message, True, key]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            self._entries.setdefault(key, []).append(entry)
+            if self._heap[0] is entry:
+                self._cond.notify()
+        return entry
+
+    def add_many(self, reminders):
+        """Queue many (fire_time, event, message, key) reminders.
+
+        A large batch is appended and heapified once (O(n)); a small one is pushed entry by entry.
+        """
+        entries = []
+        for fire_time, event, message, key in reminders:
+            key = event if key is None else key
+            entries.append([fire_time, next(self._counter), event, message, True, key])
+        if not entries:
+            return
+        with self._cond:
+            for entry in entries:
+                self._entries.setdefault(entry[KEY], []).append(entry)
+            if len(entries) > len(self._heap) // 8:
+                self._heap.extend(entries)
+                heapq.heapify(self._heap)
+            else:
+                for entry in entries:
+                    heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def cancel(self, key):
+        """Cancel every pending reminder added under `key`. Returns how many were cancelled."""
+        with self._cond:
+            entries = self._entries.pop(key, [])
+            for entry in entries:
+                entry[ACTIVE] = False
+            self._cancelled += len(entries)
+            if self._cancelled > len(self._heap) // 2:
+                self._heap = [entry for entry in self._heap if entry[ACTIVE]]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+            self._cond.notify()
+        return len(entries)
+
+    def next_fire_time(self):
+        """Datetime of the earliest pending reminder, or None."""
+        with self._cond:
+            self._discard_cancelled()
+            return self._heap[0][FIRE_TIME] if self._heap else None
+
+    def pending_until(self, until, after=None):
+        """(fire_time, event, message) for every pending reminder due after `after` and by `until`, in no particular order."""
+        with self._cond:
+            return [(entry[FIRE_TIME], entry[EVENT], entry[MESSAGE]) for entry in self._heap
+                    if entry[ACTIVE] and entry[FIRE_TIME] <= until and (after is None or entry[FIRE_TIME] > after)]
+
+    def pop_due(self, now=None):
+        """Remove and return the (event, message) pairs due at `now`."""
+        with self._cond:
+            return self._pop_due(now or datetime.now())
+
+    def run(self):
+        """Dispatch reminders as they come due until stop() is called."""
+        if self.refill is not None:
+            self._refill()
+        while True:
+            with self._cond:
+                due = []
+                while not self._stopped and not due:
+                    self._discard_cancelled()
+                    now = datetime.now()
+                    if self._next_refill is not None and self._next_refill <= now:
+                        break
+                    deadline = self._heap[0][FIRE_TIME] if self._heap else self._next_refill
+                    if self._heap and self._next_refill is not None:
+                        deadline = min(deadline, self._next_refill)
+                    if deadline is None:
+                        self._cond.wait()
+                        continue
+                    delay = (deadline - now).total_seconds()
+                    if delay > 0:
+                        self._cond.wait(min(delay, MAX_WAIT_SECONDS))
+                        continue
+                    due = self._pop_due(now)
+                if self._stopped:
+                    return
+            # Dispatch and refill outside the lock so add/cancel never wait on them
+            if due:
+                self.dispatch(due)
+            if self._next_refill is not None and self._next_refill <= datetime.now():
+                self._refill()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _refill(self):
+        try:
+            self.refill()
+        except Exception as e:
+            print(f"Failed to load upcoming reminders: {e}")
+        if self.refill_every is not None:
+            self._next_refill = datetime.now() + self.refill_every
+
+    def _discard_cancelled(self):
+        while self._heap and not self._heap[0][ACTIVE]:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][FIRE_TIME] <= now:
+            entry = heapq.heappop(self._heap)
+            if not entry[ACTIVE]:
+                self._cancelled -= 1
+                continue
+            live = self._entries.get(entry[KEY])
+            if live is not None:
+                live.remove(entry)
+                if not live:
+                    del self._entries[entry[KEY]]
+            due.append((entry[EVENT], entry[MESSAGE]))
+        return due
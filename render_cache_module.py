@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+
+
+class DayRenderCache:
+    """LRU cache of each day's formatted schedule lines.
+
+    Every date has a version counter that invalidate() bumps when the
+    ScheduleBuilder reports a change to that day; a change to a recurring
+    series bumps a generation shared by all days. An entry rendered at an
+    older version is a miss and is rendered again. At most `maxsize` days
+    are kept, least recently used first out.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # date -> ((generation, version), rendered)
+        self.versions = {}  # date -> number of changes to that day in this generation
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def invalidate(self, dates):
+        """ScheduleBuilder listener: bump the version of each changed date (every date if None)."""
+        with self.lock:
+            if dates is None:
+                self.generation += 1
+                self.versions.clear()
+            else:
+                for day in dates:
+                    self.versions[day] = self.versions.get(day, 0) + 1
+
+    def peek(self, day):
+        """The cached rendering of `day` if it is current, else None; never stores anything."""
+        with self.lock:
+            entry = self.entries.get(day)
+            if entry is not None and entry[0] == (self.generation, self.versions.get(day, 0)):
+                self.entries.move_to_end(day)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def get(self, day, render):
+        """The cached rendering of `day`, or render() stored as its new rendering."""
+        with self.lock:
+            version = (self.generation, self.versions.get(day, 0))
+            entry = self.entries.get(day)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(day)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Rendered outside the lock; render() must read the day itself, after the version above was taken,
+        # so a change meanwhile leaves the entry at an older version and the next get() misses
+        rendered = render()
+        with self.lock:
+            self.entries[day] = (version, rendered)
+            self.entries.move_to_end(day)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return rendered
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and the current size."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.entries),
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,330 @@
+"""Headless HTTP/JSON API over the schedule manager.
+
+Run `python service_module.py [--host HOST] [--port PORT]`. Requests other
+than account creation and login need an `Authorization: Bearer <token>`
+header with the token returned by POST /login.
+
+    POST   /accounts           {"username", "password"}
+    POST   /login              {"username", "password"} -> {"token"}
+    POST   /logout
+    POST   /events             block_time arguments, plus "allow_conflicts"
+    GET    /events?start=&end= events between two ISO datetimes
+    DELETE /events/<id>        an event, or a whole recurring series
+    DELETE /events?date=YYYY-MM-DD&start_hour=&name=   one event or occurrence, as delete_event
+    GET    /schedule?date=YYYY-MM-DD                   view_schedule, as text and as events
+    POST   /exports            {"format", "start", "end", "since_last"}
+    GET    /exports/<file>     download a file written by POST /exports
+    GET    /stats              mail and delivery queue counters, and your reminders by outbox state
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as Date, datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from trial_1 import (AUTH_WORKERS, CONFLICT_MESSAGE, EXPORT_FILES, PASSWORD_ALGORITHM, PASSWORD_COST, SCHEDULE_DB,
+                     SESSION_TTL, load_users, make_tenants)
+from auth_module import Authenticator, PasswordHasher
+from storage_module import ScheduleStore
+from notifier_module import COALESCE_SECONDS, make_notifier
+from task_module import TaskCancelled
+
+# Threads running ScheduleBuilder calls, so slow requests don't hold up the event loop
+SERVICE_WORKERS = 8
+
+# Each user's export files are written under EXPORT_DIR/<username>
+EXPORT_DIR = 'exports'
+
+# A server has no one at the speaker, so due reminders are only logged unless configured otherwise
+SERVICE_NOTIFIER = os.environ.get('SCHEDULER_SERVICE_NOTIFIER', 'log').split(',')
+
+# Keep-alive connections idle for longer than this are closed, in seconds
+KEEP_ALIVE_TIMEOUT = 15
+
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Function to turn an event into a JSON object
+def event_json(event):
+    return {
+        "event_id": event.event_id, "date": event.date_time.date().isoformat(), "start_hour": event.start_hour,
+        "end_hour": event.end_hour, "name": event.name, "email": event.email, "description": event.description,
+        "recurring": event.rule is not None or event.master is not None,
+    }
+
+
+# Function to read a required ISO date from the query string
+def query_date(query, key="date"):
+    try:
+        return Date.fromisoformat(query[key][0])
+    except (KeyError, ValueError):
+        raise HTTPError(400, f"'{key}' must be a YYYY-MM-DD date")
+
+
+# Function to keep a username safe to use as a directory name
+def safe_name(username):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", username).lstrip(".") or "_"
+
+
+class ScheduleService:
+    """HTTP/JSON front end sharing TenantRegistry and Authenticator with the Tk App.
+
+    Connections are HTTP/1.1 with keep-alive, each served by its own
+    coroutine. ScheduleBuilder calls and password hashing run in thread
+    pools and are awaited, so many requests are in flight at once, and
+    requests for different users only meet at their own builder's lock.
+    """
+
+    def __init__(self, tenants, auth, workers=SERVICE_WORKERS, export_dir=EXPORT_DIR):
+        self.tenants = tenants
+        self.auth = auth
+        self.export_dir = export_dir
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self.routes = {
+            ("POST", "accounts"): self.create_account,
+            ("POST", "login"): self.login,
+            ("POST", "logout"): self.logout,
+            ("POST", "events"): self.block_time,
+            ("GET", "events"): self.list_events,
+            ("DELETE", "events"): self.delete_event,
+            ("GET", "schedule"): self.view_schedule,
+            ("POST", "exports"): self.export_schedule,
+            ("GET", "exports"): self.download_export,
+            ("GET", "stats"): self.stats,
+        }
+
+    async def call(self, func, *args, **kwargs):
+        """Run a blocking call in the worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, lambda: func(*args, **kwargs))
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client closes it, asks to, or goes idle."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.dispatch(method, target, headers, body)
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive=True):
+        if isinstance(payload, bytes):
+            body, content_type = payload, "application/octet-stream"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def dispatch(self, method, target, headers, body):
+        """Route one request; returns (status, JSON-able payload or bytes)."""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        if not parts:
+            return 404, {"error": "Not found"}
+        handler = self.routes.get((method, parts[0]))
+        if handler is None:
+            known = any(resource == parts[0] for _, resource in self.routes)
+            return (405, {"error": "Method not allowed"}) if known else (404, {"error": "Not found"})
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+            request = {"args": parts[1:], "query": parse_qs(url.query), "data": data, "headers": headers}
+            return await handler(request)
+        except json.JSONDecodeError:
+            return 400, {"error": "Request body is not valid JSON"}
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": f"Bad request: {e}"}
+        except Exception as e:
+            print(f"Request {method} {url.path} failed: {e!r}")
+            return 500, {"error": "Internal server error"}
+
+    def user(self, request):
+        """The username of the request's session token, or HTTPError 401."""
+        scheme, _, token = request["headers"].get("authorization", "").partition(" ")
+        username = self.auth.session_user(token) if scheme.lower() == "bearer" else None
+        if username is None:
+            raise HTTPError(401, "Log in and send 'Authorization: Bearer <token>'")
+        return username
+
+    def builder(self, request):
+        """The request user's builder, kept loaded (not evicted) until the with block ends."""
+        return self.tenants.using(self.user(request))
+
+    async def create_account(self, request):
+        data = request["data"]
+        if not data.get("username") or not data.get("password"):
+            raise HTTPError(400, "username and password are required")
+        created = await asyncio.wrap_future(self.auth.create_account_async(data["username"], data["password"]))
+        if not created:
+            raise HTTPError(409, "Username already exists.")
+        return 201, {"message": "Account created successfully!"}
+
+    async def login(self, request):
+        data = request["data"]
+        token = await asyncio.wrap_future(self.auth.login_async(data.get("username", ""), data.get("password", "")))
+        if token is None:
+            raise HTTPError(401, "Invalid username or password.")
+        return 200, {"token": token}
+
+    async def logout(self, request):
+        self.user(request)
+        self.auth.logout(request["headers"]["authorization"].partition(" ")[2])
+        return 200, {"message": "Logged out."}
+
+    async def block_time(self, request):
+        with self.builder(request) as builder:
+            data = request["data"]
+            start_hour, end_hour = int(data["start_hour"]), int(data["end_hour"])
+            if not 0 <= start_hour < end_hour <= 24:
+                raise HTTPError(400, "hours must satisfy 0 <= start_hour < end_hour <= 24")
+            result = await self.call(builder.block_time, int(data["year"]), int(data["month"]), int(data["day"]),
+                                     start_hour, end_hour, str(data["name"]), str(data["email"]),
+                                     str(data.get("description", "")), int(data.get("recurrence", 1)),
+                                     rule=data.get("rrule"), allow_conflicts=bool(data.get("allow_conflicts")))
+            if result.startswith(CONFLICT_MESSAGE):
+                raise HTTPError(409, result)
+            return 201, {"message": result}
+
+    async def list_events(self, request):
+        with self.builder(request) as builder:
+            query = request["query"]
+            try:
+                start = datetime.fromisoformat(query["start"][0])
+                end = datetime.fromisoformat(query["end"][0])
+            except (KeyError, ValueError):
+                raise HTTPError(400, "'start' and 'end' must be ISO datetimes")
+            events = await self.call(builder.events_between, start, end)
+            return 200, {"events": [event_json(event) for event in events]}
+
+    async def delete_event(self, request):
+        with self.builder(request) as builder:
+            if request["args"]:
+                result = await self.call(builder.delete_event_by_id, request["args"][0])
+            else:
+                query = request["query"]
+                day = query_date(query)
+                result = await self.call(builder.delete_event, day.year, day.month, day.day,
+                                         int(query["start_hour"][0]), query["name"][0])
+            if result != "Event deleted successfully!":
+                raise HTTPError(404, result)
+            return 200, {"message": result}
+
+    async def view_schedule(self, request):
+        with self.builder(request) as builder:
+            day = query_date(request["query"])
+            text = await self.call(builder.view_schedule, day.year, day.month, day.day)
+            events = await self.call(builder.events_on, (day.year, day.month, day.day))
+            events.sort(key=lambda event: event.date_time)
+            return 200, {"date": day.isoformat(), "text": text, "events": [event_json(event) for event in events]}
+
+    async def export_schedule(self, request):
+        username = self.user(request)
+        with self.tenants.using(username) as builder:
+            data = request["data"]
+            format = data.get("format", "excel")
+            if format not in EXPORT_FILES:
+                raise HTTPError(400, f"Unsupported export format: {format}")
+            directory = os.path.join(self.export_dir, safe_name(username))
+            os.makedirs(directory, exist_ok=True)
+            start = datetime.fromisoformat(data["start"]) if data.get("start") else None
+            end = datetime.fromisoformat(data["end"]) if data.get("end") else None
+            try:
+                result = await self.call(builder.export_schedule, format, start, end,
+                                         since_last=bool(data.get("since_last")), directory=directory)
+            except TaskCancelled:
+                result = "Export cancelled."
+            if not result.startswith("Exported"):
+                raise HTTPError(400, result)
+            return 200, {"message": result, "file": f"/exports/{EXPORT_FILES[format]}"}
+
+    async def download_export(self, request):
+        username = self.user(request)
+        if len(request["args"]) != 1 or request["args"][0] not in EXPORT_FILES.values():
+            raise HTTPError(404, "Not found")
+        path = os.path.join(self.export_dir, safe_name(username), request["args"][0])
+        if not os.path.exists(path):
+            raise HTTPError(404, "Not exported yet")
+        return 200, await self.call(lambda: open(path, "rb").read())
+
+    async def stats(self, request):
+        with self.builder(request) as builder:
+            # The mailer is shared by all users, so only its counters are shown, not the dead letters themselves
+            reminders = await self.call(builder.store.reminder_counts, builder.owner) if builder.store is not None else {}
+            return 200, {"mail": builder.mailer.stats(), "delivery": builder.delivery.stats(), "reminders": reminders}
+
+    async def serve(self, host="127.0.0.1", port=8080, ready=None):
+        """Accept connections until cancelled. `ready`, if given, is called with the bound port."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+# Function to build the service over the same stores, tenants and reminder loop the Tk App uses
+def make_service(schedule_db=SCHEDULE_DB):
+    tenants = make_tenants(ScheduleStore(schedule_db), make_notifier(SERVICE_NOTIFIER, COALESCE_SECONDS))
+    hasher = PasswordHasher(PASSWORD_ALGORITHM, PASSWORD_COST)
+    auth = Authenticator(load_users(hasher), hasher, workers=AUTH_WORKERS, session_ttl=SESSION_TTL)
+    # Reminders are sent from this process, as in the Tk App
+    threading.Thread(target=tenants.run, name="tenants", daemon=True).start()
+    return ScheduleService(tenants, auth)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the schedule manager as an HTTP/JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    service = make_service()
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,295 @@
+import csv
+import os
+import sqlite3
+import threading
+
+EVENT_COLUMNS = ("event_id", "owner", "date", "start_hour", "end_hour", "name", "email",
+                 "description", "recurrence", "rrule", "last_date", "exdates", "updated_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id    TEXT PRIMARY KEY,
+    owner       TEXT,
+    date        TEXT NOT NULL,               -- YYYY-MM-DD of the event, or of the first occurrence
+    start_hour  INTEGER NOT NULL,
+    end_hour    INTEGER NOT NULL,
+    name        TEXT NOT NULL,
+    email       TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    recurrence  INTEGER NOT NULL DEFAULT 1,
+    rrule       TEXT,                        -- set for a recurring series
+    last_date   TEXT,                        -- last occurrence of a series, NULL if endless
+    exdates     TEXT NOT NULL DEFAULT '',    -- comma-separated ISO start times of deleted occurrences
+    updated_at  TEXT NOT NULL DEFAULT ''     -- ISO time of the last change, for incremental exports
+);
+CREATE INDEX IF NOT EXISTS events_date ON events (date);
+CREATE INDEX IF NOT EXISTS events_start_hour ON events (start_hour);
+CREATE INDEX IF NOT EXISTS events_owner_date ON events (owner, date);
+CREATE INDEX IF NOT EXISTS events_series ON events (owner, date) WHERE rrule IS NOT NULL;
+CREATE INDEX IF NOT EXISTS events_updated ON events (owner, updated_at);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    reminder_key TEXT PRIMARY KEY,           -- idempotency key: event id, occurrence start and offset
+    owner        TEXT,
+    event_id     TEXT NOT NULL,
+    occurrence   TEXT NOT NULL,              -- ISO start of the event or occurrence reminded about
+    message      TEXT NOT NULL,
+    fire_at      TEXT NOT NULL,              -- ISO time the reminder is due
+    state        TEXT NOT NULL DEFAULT 'pending',  -- pending, sending, sent, failed or skipped
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    error        TEXT NOT NULL DEFAULT '',
+    updated_at   TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS reminders_due ON reminders (state, owner, fire_at);
+CREATE INDEX IF NOT EXISTS reminders_event ON reminders (event_id);
+"""
+
+REMINDER_COLUMNS = ("reminder_key", "owner", "event_id", "occurrence", "message", "fire_at", "updated_at")
+
+
+def connect(path):
+    """Open a SQLite database in WAL mode, shared between threads behind a lock."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ScheduleStore:
+    """Persistent event storage: one row per event or recurring series.
+
+    Each write is a single-row transaction. Reads are range queries on the
+    indexed date column, so a ScheduleBuilder can pull in only the days it
+    is showing or sending reminders for. The reminders table is the outbox
+    of reminders due soon, with their delivery state.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(events)")]
+            if columns and "updated_at" not in columns:
+                # Databases created before incremental exports existed
+                self.conn.execute("ALTER TABLE events ADD COLUMN updated_at TEXT NOT NULL DEFAULT ''")
+            self.conn.executescript(SCHEMA)
+
+    def add(self, row):
+        """Insert one event row (a dict keyed by EVENT_COLUMNS)."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+                [row[column] for column in EVENT_COLUMNS])
+
+    def add_many(self, rows):
+        """Insert many event rows in one transaction."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join('?' * len(EVENT_COLUMNS))})",
+                ([row[column] for column in EVENT_COLUMNS] for row in rows))
+
+    def delete(self, event_id):
+        """Delete one event row. Returns True if it existed."""
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM events WHERE event_id = ?", (event_id,)).rowcount > 0
+
+    def update(self, event_id, **values):
+        """Update some columns of one event row."""
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self.lock, self.conn:
+            self.conn.execute(f"UPDATE events SET {assignments} WHERE event_id = ?", (*values.values(), event_id))
+
+    def get(self, event_id, owner=None):
+        """The row of one event or series of `owner`, or None."""
+        with self.lock:
+            return self.conn.execute("SELECT * FROM events WHERE event_id = ? AND owner IS ?",
+                                     (event_id, owner)).fetchone()
+
+    def load_between(self, first_date, last_date, owner=None):
+        """Rows for one-off events dated first_date..last_date, plus recurring series active in that span.
+
+        Dates are ISO 'YYYY-MM-DD' strings; both ends are inclusive.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM events WHERE owner IS ? AND date BETWEEN ? AND ? AND rrule IS NULL",
+                (owner, first_date, last_date)).fetchall()
+            rows += self.conn.execute(
+                "SELECT * FROM events WHERE owner IS ? AND rrule IS NOT NULL AND date <= ?"
+                " AND (last_date IS NULL OR last_date >= ?)",
+                (owner, last_date, first_date)).fetchall()
+        return rows
+
+    def owners_between(self, first_date, last_date):
+        """Owners with a one-off event or an active recurring series dated first_date..last_date (inclusive)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT owner FROM events WHERE date BETWEEN ? AND ? AND rrule IS NULL"
+                " UNION SELECT DISTINCT owner FROM events WHERE rrule IS NOT NULL AND date <= ?"
+                " AND (last_date IS NULL OR last_date >= ?)",
+                (first_date, last_date, last_date, first_date)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_changed_since(self, moment, owner=None):
+        """Rows of one owner changed after the ISO timestamp `moment`."""
+        with self.lock:
+            return self.conn.execute("SELECT * FROM events WHERE owner IS ? AND updated_at > ? ORDER BY date, start_hour",
+                                     (owner, moment)).fetchall()
+
+    def load_all(self, owner=None):
+        """Rows for every event of one owner."""
+        with self.lock:
+            return self.conn.execute("SELECT * FROM events WHERE owner IS ?", (owner,)).fetchall()
+
+    def count(self, owner=None):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM events WHERE owner IS ?", (owner,)).fetchone()[0]
+
+    # Reminder outbox: one row per reminder, so pending ones survive a restart and each is sent at most once
+
+    def add_reminders(self, rows):
+        """Record reminders (dicts keyed by REMINDER_COLUMNS) as pending; ones already recorded are left as they are."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO reminders ({', '.join(REMINDER_COLUMNS)})"
+                f" VALUES ({', '.join('?' * len(REMINDER_COLUMNS))})",
+                ([row[column] for column in REMINDER_COLUMNS] for row in rows))
+
+    def claim_reminders(self, rows):
+        """Move reminders to 'sending', recording any not seen before. Returns the keys this call claimed.
+
+        A reminder is claimed only from 'pending' (or when it has no row
+        yet), so when several threads or processes fire the same reminder,
+        exactly one of them gets to send it.
+        """
+        claimed = []
+        with self.lock, self.conn:
+            for row in rows:
+                cursor = self.conn.execute(
+                    f"INSERT INTO reminders ({', '.join(REMINDER_COLUMNS)}, state, attempts)"
+                    f" VALUES ({', '.join('?' * len(REMINDER_COLUMNS))}, 'sending', 1)"
+                    " ON CONFLICT (reminder_key) DO UPDATE SET state = 'sending', attempts = attempts + 1,"
+                    " updated_at = excluded.updated_at WHERE state = 'pending'",
+                    [row[column] for column in REMINDER_COLUMNS])
+                if cursor.rowcount:
+                    claimed.append(row["reminder_key"])
+        return claimed
+
+    def mark_reminders(self, updates, moment):
+        """Set (reminder_key, state, error) for each reminder, at the ISO timestamp `moment`."""
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE reminders SET state = ?, error = ?, updated_at = ? WHERE reminder_key = ?",
+                                  ((state, error, moment, key) for key, state, error in updates))
+
+    def cancel_reminders(self, event_id):
+        """Delete the pending reminders of one event or series."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM reminders WHERE event_id = ? AND state = 'pending'", (event_id,))
+
+    def due_reminders(self, moment, owner=None, limit=500):
+        """Up to `limit` pending reminders of one owner due by the ISO timestamp `moment`, latest first."""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT * FROM reminders WHERE state = 'pending' AND owner IS ? AND fire_at <= ?"
+                " ORDER BY fire_at DESC LIMIT ?", (owner, moment, limit)).fetchall()
+
+    def abandon_reminders(self, before, moment, owner=None):
+        """Mark 'failed' the reminders of one owner left in 'sending' since before `before`. Returns how many."""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE reminders SET state = 'failed', error = 'interrupted while sending', updated_at = ?"
+                " WHERE state = 'sending' AND owner IS ? AND updated_at < ?", (moment, owner, before)).rowcount
+
+    def purge_reminders(self, before, owner=None):
+        """Delete finished reminders of one owner due before the ISO timestamp `before`."""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM reminders WHERE state IN ('sent', 'failed', 'skipped') AND owner IS ?"
+                              " AND fire_at < ?", (owner, before))
+
+    def reminder_counts(self, owner=None):
+        """Number of reminders of one owner in each state."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM reminders WHERE owner IS ? GROUP BY state",
+                                          (owner,)).fetchall())
+
+    def owners_with_due_reminders(self, moment):
+        """Owners with pending reminders due by the ISO timestamp `moment`."""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT owner FROM reminders WHERE state = 'pending' AND fire_at <= ?",
+                                     (moment,)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class UserStore:
+    """Accounts in an indexed SQLite table, shared safely between app instances.
+
+    A lookup is one primary-key read, so nothing is loaded at startup and
+    accounts created by another process are visible right away. add() is a
+    single INSERT: when two processes race for the same username, exactly one
+    of them gets the account.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = connect(path)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT NOT NULL)")
+
+    def __contains__(self, username):
+        return self.get_password(username) is not None
+
+    def get_password(self, username):
+        """The stored password value for `username`, or None if there is no such user."""
+        with self.lock:
+            row = self.conn.execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, username, password):
+        """Create an account. Returns False if the username is already taken."""
+        try:
+            with self.lock, self.conn:
+                self.conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def set_password(self, username, password):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE users SET password = ? WHERE username = ?", (password, username))
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def migrate_from_csv(self, csv_path, hash_password):
+        """Import a legacy username,password CSV in one transaction, then delete it.
+
+        Passwords are stored as hash_password(password), so no plaintext is
+        kept in the database or on disk. Usernames that already exist are left
+        unchanged. Returns how many users were imported.
+        """
+        if not os.path.exists(csv_path):
+            return 0
+        with open(csv_path, mode='r', newline='') as f:
+            rows = [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2]
+        with self.lock:
+            existing = {username for (username,) in self.conn.execute("SELECT username FROM users")}
+        # Hashed outside the lock and the transaction, as each hash takes tens of milliseconds
+        rows = [(username, hash_password(password)) for username, password in rows if username not in existing]
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", rows)
+            imported = self.conn.total_changes - before
+        os.remove(csv_path)
+        return imported
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# How often the Tk loop checks running tasks for progress and results, in milliseconds
+POLL_MS = 50
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task, at its next progress report, after cancel() was called."""
+
+
+class Task:
+    """One background call: its future, the latest progress it reported and a cancel flag."""
+
+    def __init__(self):
+        self.future = None
+        self.progress = None  # latest (done, total) from the worker
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the task to stop. It stops at its next progress report."""
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def report(self, done, total=None):
+        """Progress callback handed to the worker function."""
+        self.progress = (done, total)
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+
+class TaskRunner:
+    """Runs blocking ScheduleBuilder calls on worker threads and hands the results back to the Tk thread.
+
+    Workers are threads rather than processes because the schedule lives in
+    the builder's memory and the builder already guards it with a lock.
+    Tk widgets are only touched from the callbacks, which run on the Tk
+    thread via root.after().
+    """
+
+    def __init__(self, root, workers=2):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task")
+
+    def run(self, func, *args, on_done=None, on_error=None, on_progress=None, **kwargs):
+        """Call func(*args, **kwargs) on a worker thread and return its Task.
+
+        With `on_progress`, func is also passed progress=task.report, which
+        is how a task notices cancel(). on_done(result), on_error(exception)
+        and on_progress(done, total) are called on the Tk thread.
+        """
+        task = Task()
+        if on_progress is not None:
+            kwargs["progress"] = task.report
+        task.future = self.executor.submit(func, *args, **kwargs)
+        self._poll(task, on_done, on_error, on_progress, None)
+        return task
+
+    def _poll(self, task, on_done, on_error, on_progress, shown):
+        progress = task.progress
+        if on_progress is not None and progress is not None and progress != shown:
+            on_progress(*progress)
+            shown = progress
+        if not task.future.done():
+            self.root.after(POLL_MS, self._poll, task, on_done, on_error, on_progress, shown)
+            return
+        error = task.future.exception()
+        if error is not None:
+            if on_error is None:
+                raise error
+            on_error(error)
+        elif on_done is not None:
+            on_done(task.future.result())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
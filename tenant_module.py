@@ -0,0 +1,140 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+
+class TenantRegistry:
+    """One ScheduleBuilder per user, created on first use and evicted when idle.
+
+    `factory(username)` makes a tenant's builder; each has its own lock and
+    its own reminder thread, so edits and reminders of different users run
+    concurrently. When more than `max_tenants` are loaded, the least
+    recently used ones are evicted, except pinned tenants (the user logged
+    in to the GUI), tenants a request is using, and tenants with a reminder
+    due within `lookahead`. run() periodically asks the store which users
+    have events coming up and loads them, so evicted users still get
+    reminded.
+    """
+
+    def __init__(self, factory, store=None, max_tenants=32, lookahead=timedelta(days=2),
+                 wake_every=timedelta(hours=1)):
+        self.factory = factory
+        self.store = store
+        self.max_tenants = max_tenants
+        self.lookahead = lookahead
+        self.wake_every = wake_every
+        self.tenants = OrderedDict()  # username -> builder, least recently used first
+        self.threads = {}  # username -> thread running that builder's reminders
+        self.pinned = set()  # usernames _evict_idle() never unloads
+        self.in_use = {}  # username -> number of using() blocks running, which _evict_idle() waits for
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __len__(self):
+        return len(self.tenants)
+
+    def __contains__(self, username):
+        return username in self.tenants
+
+    def get(self, username):
+        """The builder for `username`, loading it (and evicting idle tenants) if needed."""
+        with self.lock:
+            return self._load(username)
+
+    @contextmanager
+    def using(self, username):
+        """get(username), kept loaded until the with block ends, e.g. across the awaits of one request.
+
+        A builder evicted mid-request would take the request's edit while a
+        newly loaded builder for the same user never saw it.
+        """
+        with self.lock:
+            builder = self._load(username)
+            self.in_use[username] = self.in_use.get(username, 0) + 1
+        try:
+            yield builder
+        finally:
+            with self.lock:
+                self.in_use[username] -= 1
+                if not self.in_use[username]:
+                    del self.in_use[username]
+
+    def _load(self, username):
+        builder = self.tenants.get(username)
+        if builder is not None:
+            self.tenants.move_to_end(username)
+            return builder
+        builder = self.factory(username)
+        self.tenants[username] = builder
+        thread = threading.Thread(target=builder.reminders.run, name=f"reminders-{username}", daemon=True)
+        self.threads[username] = thread
+        thread.start()
+        self._evict_idle()
+        return builder
+
+    def pin(self, username):
+        """Load `username` and keep it loaded until unpin(), e.g. for the session of a logged-in user."""
+        with self.lock:
+            self.pinned.add(username)
+        return self.get(username)
+
+    def unpin(self, username):
+        """Let `username` be evicted again when idle."""
+        with self.lock:
+            self.pinned.discard(username)
+
+    def _evict_idle(self):
+        """Drop least recently used tenants over max_tenants, except pinned, in-use and soon-reminding ones."""
+        soon = datetime.now() + self.lookahead
+        for username in list(self.tenants)[:-1]:  # never the tenant just used
+            if len(self.tenants) <= self.max_tenants:
+                return
+            if username in self.pinned or username in self.in_use:
+                continue
+            builder = self.tenants[username]
+            next_fire = builder.reminders.next_fire_time()
+            if next_fire is not None and next_fire <= soon:
+                continue
+            del self.tenants[username]
+            builder.reminders.stop()
+            self.threads.pop(username, None)
+
+    def evict(self, username):
+        """Unload one tenant now, e.g. at logout. Returns False if it was not loaded."""
+        with self.lock:
+            self.pinned.discard(username)
+            builder = self.tenants.pop(username, None)
+            if builder is None:
+                return False
+            builder.reminders.stop()
+            self.threads.pop(username, None)
+            return True
+
+    def wake_upcoming(self):
+        """Load every user with events in the next `lookahead` or missed reminders, so their reminders are sent."""
+        if self.store is None:
+            return []
+        now = datetime.now()
+        today = now.date()
+        owners = self.store.owners_between(today.isoformat(), (today + self.lookahead).isoformat())
+        owners = list(dict.fromkeys(owners + self.store.owners_with_due_reminders(now.isoformat())))
+        for owner in owners:
+            if owner is not None:
+                self.get(owner)
+        return owners
+
+    def run(self):
+        """Call wake_upcoming() every `wake_every` until stop()."""
+        while not self._stopped.is_set():
+            try:
+                self.wake_upcoming()
+            except Exception as e:
+                print(f"Failed to load upcoming tenants: {e}")
+            self._stopped.wait(self.wake_every.total_seconds())
+
+    def stop(self):
+        self._stopped.set()
+        with self.lock:
+            for builder in self.tenants.values():
+                builder.reminders.stop()
@@ -0,0 +1,32 @@
+from storage_module import ScheduleStore
+from test_schedule_builder import make_builder
+
+
+def test_bad_csv_rows_are_skipped_and_reported(tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("Date,Start,End,Event,Email\n"
+                    "2040-06-01,9,10,Standup,alice@example.com\n"
+                    "01/06/2040,9,10,Planning,alice@example.com\n"
+                    "2040-06-02,11,10,Backwards,alice@example.com\n"
+                    "2040-06-03,14,15,Retro,alice@example.com\n")
+    builder = make_builder(ScheduleStore(str(tmp_path / "schedule.db")))
+    errors = []
+
+    assert builder.import_file(str(path), errors) == "Loaded 2 events, skipped 2 invalid rows."
+    assert [number for number, _ in errors] == [2, 3]
+    assert "01/06/2040" in errors[0][1]
+    assert [event.name for event in builder.events_on((2040, 6, 3))] == ["Retro"]
+
+
+def test_bad_json_lines_are_skipped_and_reported(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text('{"date": "2040-06-01", "start": 9, "end": 10, "name": "Standup", "email": "alice@example.com"}\n'
+                    '{"date": "2040-06-02", "start": 9,\n'
+                    '[1, 2]\n'
+                    '{"date": "2040-06-03", "start": 14, "end": 15, "name": "Retro", "email": "alice@example.com"}\n')
+    builder = make_builder(ScheduleStore(str(tmp_path / "schedule.db")))
+    errors = []
+
+    assert builder.import_file(str(path), errors) == "Loaded 2 events, skipped 2 invalid rows."
+    assert [number for number, _ in errors] == [2, 3]
+    assert [event.name for event in builder.events_on((2040, 6, 3))] == ["Retro"]
@@ -0,0 +1,86 @@
+import smtplib
+
+import pytest
+
+from email_module import DeliveryQueue, SMTPConnectionPool, TokenBucket, backoff_delay, is_transient
+
+
+class FakeServer:
+    """Stands in for smtplib.SMTP: refuses the first `failures[to]` sends to each recipient with `error`."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.sent = []
+
+    def sendmail(self, from_addr, to_addrs, message):
+        if self.failures.get(to_addrs, 0):
+            self.failures[to_addrs] -= 1
+            raise self.error
+        self.sent.append(to_addrs)
+
+    def quit(self):
+        pass
+
+
+# Function to build a pool whose sessions are one FakeServer, with no waits between retries
+def make_pool(server, max_retries=2):
+    pool = SMTPConnectionPool("localhost", 25, use_tls=False, size=1, max_retries=max_retries, retry_base=0, retry_cap=0)
+    pool.connect = lambda: server
+    return pool
+
+
+def test_throttling_and_dropped_connections_are_transient():
+    assert is_transient(smtplib.SMTPResponseException(421, b"try again later"))
+    assert is_transient(smtplib.SMTPServerDisconnected())
+    assert is_transient(ConnectionResetError())
+    assert is_transient(smtplib.SMTPRecipientsRefused({"a@example.com": (450, b"mailbox busy")}))
+
+
+def test_rejections_are_permanent():
+    assert not is_transient(smtplib.SMTPResponseException(550, b"no such user"))
+    assert not is_transient(smtplib.SMTPRecipientsRefused({"a@example.com": (450, b"busy"), "b@example.com": (550, b"no")}))
+    assert not is_transient(smtplib.SMTPRecipientsRefused({}))
+
+
+def test_backoff_delay_grows_and_is_capped():
+    for attempt in range(8):
+        assert 0 <= backoff_delay(attempt, 2.0, 60.0) <= min(60.0, 2.0 * 2 ** attempt)
+    assert max(backoff_delay(10, 2.0, 5.0) for _ in range(100)) <= 5.0
+
+
+def test_transient_failures_are_retried():
+    server = FakeServer({"a@example.com": 2}, smtplib.SMTPResponseException(421, b"slow down"))
+    pool = make_pool(server)
+
+    assert pool.send_batch([("me@example.com", "a@example.com", "hi"), ("me@example.com", "b@example.com", "hi")]) == [None, None]
+    assert server.sent == ["b@example.com", "a@example.com"]
+    assert pool.stats() == {"sent": 2, "retried": 2, "dropped": 0, "dead_letters": 0}
+
+
+@pytest.mark.parametrize("failures, code, retried", [(5, 421, 2), (1, 550, 0)])
+def test_messages_given_up_on_are_dead_letters(failures, code, retried):
+    server = FakeServer({"a@example.com": failures}, smtplib.SMTPResponseException(code, b"no"))
+    pool = make_pool(server)
+
+    [error] = pool.send_batch([("me@example.com", "a@example.com", "hi")])
+    assert error.smtp_code == code
+    assert pool.stats() == {"sent": 0, "retried": retried, "dropped": 1, "dead_letters": 1}
+    assert pool.dead_letters[0]["to"] == "a@example.com" and pool.dead_letters[0]["transient"] == (code < 500)
+
+
+def test_items_waiting_on_the_rate_limit_do_not_expire():
+    bucket = TokenBucket(200, 1)
+    handled, expired = [], []
+
+    def handler(items):
+        for item in items:
+            bucket.acquire()
+            handled.append(item)
+
+    delivery = DeliveryQueue(handler, workers=2, maxsize=100, timeout=0.05, batch_size=10, on_expired=expired.extend,
+                             rate=200)
+    for item in range(100):
+        assert delivery.submit(item)
+    delivery.join()
+    assert sorted(handled) == list(range(100)) and expired == []
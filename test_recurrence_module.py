@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from recurrence_module import RecurrenceRule
+from storage_module import ScheduleStore
+from test_schedule_builder import make_builder
+
+CALENDAR = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART:20400305T090000
+DTEND:20400305T100000
+SUMMARY:Standup
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=6
+END:VEVENT
+BEGIN:VEVENT
+DTSTART:20400305T090000
+DTEND:20400305T100000
+SUMMARY:Weekly review
+RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=3
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+@pytest.mark.parametrize("text", ["FREQ=WEEKLY;BYDAY=MO,WE", "FREQ=DAILY;BYHOUR=9", "FREQ=WEEKLY;BYSETPOS=1", "FREQ=MONTHLY"])
+def test_rules_that_cannot_be_represented_are_rejected(text):
+    with pytest.raises(ValueError):
+        RecurrenceRule.from_rrule(text)
+
+
+def test_utc_until_is_converted_to_local_time():
+    until = datetime(2040, 3, 19, 9, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert RecurrenceRule.from_rrule("FREQ=WEEKLY;UNTIL=20400319T090000Z").until == until
+    assert RecurrenceRule.from_rrule("FREQ=WEEKLY;UNTIL=20400319").until == datetime(2040, 3, 19, 23, 59, 59, 999999)
+
+
+def test_ics_rows_with_unsupported_rules_are_reported(tmp_path):
+    path = tmp_path / "calendar.ics"
+    path.write_text(CALENDAR)
+    builder = make_builder(ScheduleStore(str(tmp_path / "schedule.db")))
+    errors = []
+
+    # 2040-03-05 is a Monday, so BYDAY=MO is the plain weekly rule
+    assert builder.import_file(str(path), errors, "alice@example.com") == "Loaded 1 events, skipped 1 invalid rows."
+    assert [number for number, _ in errors] == [1]
+    assert "BYDAY" in errors[0][1]
+    assert [event.name for event in builder.events_on((2040, 3, 19))] == ["Weekly review"]
+
+
+def test_every_exdate_line_of_an_ics_event_is_kept(tmp_path):
+    path = tmp_path / "calendar.ics"
+    path.write_text("BEGIN:VCALENDAR\nBEGIN:VEVENT\nDTSTART:20400305T090000\nDTEND:20400305T100000\nSUMMARY:Standup\n"
+                    "RRULE:FREQ=DAILY;COUNT=5\nEXDATE:20400306T090000\nEXDATE:20400307T090000\nEND:VEVENT\nEND:VCALENDAR\n")
+    builder = make_builder(ScheduleStore(str(tmp_path / "schedule.db")))
+
+    assert builder.import_file(str(path), [], "alice@example.com") == "Loaded 1 events."
+    assert [day for day in range(5, 10) if builder.events_on((2040, 3, day))] == [5, 8, 9]
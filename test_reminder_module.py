@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime, timedelta
+
+from email_module import DeliveryQueue
+from reminder_module import ReminderQueue
+from test_schedule_builder import make_builder
+
+BASE = datetime(2040, 3, 15, 9)
+TOMORROW = "Reminder: Your event is tomorrow!"
+
+
+# Function to make a queue that is never run(), so tests pop reminders themselves
+def make_queue():
+    return ReminderQueue(lambda due: None)
+
+
+def test_reminders_come_due_in_fire_time_order():
+    reminders = make_queue()
+    reminders.add(BASE + timedelta(hours=3), "c", "m")
+    reminders.add(BASE + timedelta(hours=1), "a", "m")
+    reminders.add_many([(BASE + timedelta(hours=2), "b", "m", None), (BASE + timedelta(hours=4), "d", "m", None)])
+    # A batch larger than an eighth of the heap is heapified rather than pushed
+    reminders.add_many([(BASE + timedelta(minutes=minute), f"e{minute}", "m", None) for minute in (50, 10, 30)])
+
+    assert reminders.next_fire_time() == BASE + timedelta(minutes=10)
+    assert [event for event, _ in reminders.pop_due(BASE + timedelta(hours=2))] == ["e10", "e30", "e50", "a", "b"]
+    assert len(reminders) == 2
+    assert [event for event, _ in reminders.pop_due(BASE + timedelta(days=1))] == ["c", "d"]
+
+
+def test_reminders_at_the_same_time_keep_the_order_they_were_added():
+    reminders = make_queue()
+    for event in "abc":
+        reminders.add(BASE, event, "m")
+    assert [event for event, _ in reminders.pop_due(BASE)] == ["a", "b", "c"]
+
+
+def test_only_reminders_that_are_due_are_popped():
+    reminders = make_queue()
+    reminders.add(BASE, "now", "m")
+    reminders.add(BASE + timedelta(seconds=1), "later", "m")
+
+    assert reminders.pop_due(BASE) == [("now", "m")]
+    assert reminders.pop_due(BASE) == []
+    assert reminders.next_fire_time() == BASE + timedelta(seconds=1)
+
+
+def test_cancelled_reminders_never_come_due():
+    reminders = make_queue()
+    reminders.add(BASE, "event", "day before", key="id-1")
+    reminders.add(BASE + timedelta(minutes=1), "event", "ten minutes", key="id-1")
+    reminders.add(BASE + timedelta(minutes=2), "other", "m", key="id-2")
+
+    assert reminders.cancel("id-1") == 2
+    assert reminders.cancel("id-1") == 0
+    assert len(reminders) == 1
+    assert reminders.next_fire_time() == BASE + timedelta(minutes=2)
+    assert reminders.pop_due(BASE + timedelta(hours=1)) == [("other", "m")]
+
+
+def test_cancelling_most_of_the_heap_compacts_it():
+    reminders = make_queue()
+    reminders.add_many([(BASE + timedelta(minutes=i), f"event {i}", "m", i) for i in range(10)])
+    for i in range(4):
+        reminders.cancel(i)
+    assert len(reminders._heap) == 10  # only marked inactive so far
+
+    reminders.cancel(4)
+    reminders.cancel(5)
+    assert len(reminders._heap) == 4 and len(reminders) == 4
+    assert [event for event, _ in reminders.pop_due(BASE + timedelta(hours=1))] == [f"event {i}" for i in range(6, 10)]
+
+
+def test_run_dispatches_due_reminders_until_stopped():
+    dispatched = threading.Event()
+    due = []
+    reminders = ReminderQueue(lambda batch: (due.extend(batch), dispatched.set()))
+    thread = threading.Thread(target=reminders.run, daemon=True)
+    thread.start()
+    reminders.add(datetime.now(), "event", "m")
+
+    assert dispatched.wait(5)
+    reminders.stop()
+    thread.join(5)
+    assert due == [("event", "m")] and not thread.is_alive()
+
+
+def test_a_series_queues_its_next_reminder_when_one_fires():
+    builder = make_builder(None)
+    sent = []
+    builder.delivery = DeliveryQueue(sent.extend, workers=1)
+    builder.block_time(2040, 3, 15, 9, 10, "Standup", "alice@example.com", rule="FREQ=DAILY;COUNT=3")
+
+    # Only the first occurrence's reminders are queued up front
+    assert sorted(fire_time for fire_time, _, _ in builder.reminders.pending_until(datetime.max)) == \
+        [BASE - timedelta(days=1), BASE - timedelta(minutes=10)]
+    due = builder.reminders.pop_due(BASE - timedelta(days=1))
+    builder.send_due_reminders(due)
+    builder.delivery.join()
+
+    assert [(event.date_time, message) for event, message in sent] == [(BASE, TOMORROW)]
+    assert sorted(fire_time for fire_time, _, _ in builder.reminders.pending_until(datetime.max)) == \
+        [BASE - timedelta(minutes=10), BASE]
+
+
+def test_the_last_occurrence_queues_no_further_reminder():
+    builder = make_builder(None)
+    builder.delivery = DeliveryQueue(lambda due: None, workers=1)
+    builder.block_time(2040, 3, 15, 9, 10, "Standup", "alice@example.com", rule="FREQ=DAILY;COUNT=1")
+
+    builder.send_due_reminders(builder.reminders.pop_due(BASE - timedelta(days=1)))
+    assert [message for _, _, message in builder.reminders.pending_until(datetime.max)] == \
+        ["Reminder: Your event is in 10 minutes!"]
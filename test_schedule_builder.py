@@ -0,0 +1,78 @@
+from datetime import date
+
+from notifier_module import make_notifier
+from storage_module import ScheduleStore
+from trial_1 import ScheduleBuilder
+
+
+# Function to build a builder over a store, as the App and the HTTP service do
+def make_builder(store, owner="alice"):
+    return ScheduleBuilder(store=store, owner=owner, notifier=make_notifier(["none"]))
+
+
+# Function to create one event and return its id
+def add_event(builder, day=15, name="Review"):
+    assert builder.block_time(2040, 3, day, 9, 10, name, "alice@example.com") == "Time blocked successfully!"
+    return builder.events_on((2040, 3, day))[0].event_id
+
+
+def test_events_are_found_by_id_after_a_restart(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.db"))
+    event_id = add_event(make_builder(store))
+
+    restarted = make_builder(store)
+    assert restarted.get_event(event_id).name == "Review"
+    assert restarted.update_event(event_id, name="Planning") == "Event updated successfully!"
+    assert make_builder(store).get_event(event_id).name == "Planning"
+
+    restarted = make_builder(store)
+    assert restarted.delete_event_by_id(event_id) == "Event deleted successfully!"
+    assert store.count("alice") == 0
+    assert restarted.events_on((2040, 3, 15)) == []
+
+
+def test_events_of_other_owners_are_not_found_by_id(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.db"))
+    event_id = add_event(make_builder(store, "alice"))
+
+    assert make_builder(store, "bob").delete_event_by_id(event_id) == "Event not found!"
+    assert store.count("alice") == 1
+
+
+def test_moving_a_reloaded_event_keeps_one_copy(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.db"))
+    event_id = add_event(make_builder(store))
+
+    restarted = make_builder(store)
+    restarted.update_event(event_id, day=date(2040, 3, 16))
+    assert restarted.events_on((2040, 3, 15)) == []
+    assert [event.event_id for event in restarted.events_on((2040, 3, 16))] == [event_id]
+
+
+def test_an_export_does_not_cache_a_day_changed_after_its_snapshot():
+    builder = make_builder(None)
+    add_event(builder, day=15, name="Review")
+    days = builder._rendered_days(builder.iter_events(), None, None)
+
+    builder.block_time(2040, 3, 15, 11, 12, "Planning", "alice@example.com")
+    assert [rendered for _, rendered in days][0][0][0].endswith("Review (Email: alice@example.com)")
+    assert "Planning" in builder.view_schedule(2040, 3, 15)
+
+
+def test_reminders_that_expire_in_the_delivery_queue_are_dead_letters(tmp_path):
+    builder = make_builder(ScheduleStore(str(tmp_path / "schedule.db")))
+    event = builder.get_event(add_event(builder))
+
+    builder.delivery.on_expired([(event, "Reminder: Your event is tomorrow!")])
+    assert builder.mailer.stats()["dropped"] == 1
+    assert builder.mailer.dead_letters[0]["to"] == "alice@example.com"
+
+
+def test_exports_reuse_days_rendered_for_the_day_view(tmp_path):
+    builder = make_builder(None)
+    add_event(builder, day=15)
+    add_event(builder, day=16, name="Planning")
+    builder.rendered_day(date(2040, 3, 15))
+
+    builder.export_schedule("word", directory=str(tmp_path))
+    assert builder.render_cache.stats()["hits"] == 1
@@ -0,0 +1,9 @@
+import subprocess
+import sys
+
+
+def test_the_service_imports_without_tkinter():
+    # A None entry in sys.modules makes `import tkinter` raise ImportError, as on a server without python3-tk
+    code = "import sys; sys.modules['tkinter'] = None; import service_module; print('ok')"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.stdout.strip() == "ok", result.stderr
@@ -0,0 +1,19 @@
+import os
+
+from auth_module import Authenticator, PasswordHasher
+from storage_module import UserStore
+
+
+def test_migrated_passwords_are_hashed_and_the_csv_is_deleted(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("alice,secret\nbob,hunter2\n")
+    users = UserStore(str(tmp_path / "users.db"))
+    hasher = PasswordHasher("pbkdf2", 10)
+
+    assert users.migrate_from_csv(str(csv_path), hasher.hash) == 2
+    assert not [name for name in os.listdir(tmp_path) if ".csv" in name]
+    assert not hasher.needs_rehash(users.get_password("alice"))
+    auth = Authenticator(users, hasher)
+    assert auth.login("alice", "secret") is not None
+    assert auth.login("bob", "secret") is None
+
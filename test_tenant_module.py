@@ -0,0 +1,35 @@
+from storage_module import ScheduleStore
+from tenant_module import TenantRegistry
+from test_schedule_builder import make_builder
+
+
+def test_a_pinned_tenant_is_never_evicted(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.db"))
+    tenants = TenantRegistry(lambda username: make_builder(store, username), store, max_tenants=2)
+    alice = tenants.pin("alice")
+    try:
+        for username in ("bob", "carol", "dave"):
+            tenants.get(username)
+        assert "alice" in tenants and tenants.get("alice") is alice
+        assert len(tenants) == 2
+
+        tenants.unpin("alice")
+        tenants.get("erin")
+        tenants.get("frank")
+        assert "alice" not in tenants
+    finally:
+        tenants.stop()
+
+
+def test_a_tenant_in_use_is_not_evicted_until_the_request_ends(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedule.db"))
+    tenants = TenantRegistry(lambda username: make_builder(store, username), store, max_tenants=1)
+    try:
+        with tenants.using("alice") as alice:
+            tenants.get("bob")
+            tenants.get("carol")
+            assert tenants.get("alice") is alice
+        tenants.get("dave")
+        assert "alice" not in tenants and tenants.in_use == {}
+    finally:
+        tenants.stop()
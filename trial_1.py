@@ -1,165 +1,1082 @@
-import tkinter as tk
-from tkinter import messagebox, simpledialog
-from tkinter import ttk
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import smtplib
-import schedule
-import time
 import threading
-from datetime import datetime, timedelta
-import pandas as pd
-from docx import Document
-import winsound
-from tkcalendar import Calendar
+import sys
+import bisect
+from array import array
+import uuid
+import heapq
+from itertools import groupby
+from datetime import date as Date, datetime, timedelta
 import os
-import csv
-
-# Assuming users are stored in a CSV file (username,password format)
+from index_module import EventIndex
+from reminder_module import ReminderQueue
+from email_module import DeliveryQueue, SMTPConnectionPool
+from notifier_module import COALESCE_SECONDS, make_notifier
+from recurrence_module import RecurrenceRule
+from storage_module import ScheduleStore, UserStore
+from auth_module import Authenticator, PasswordHasher
+from bulk_import_module import read_csv_rows, read_json_rows
+from export_module import export_columnar, export_csv, export_excel, export_jsonl, read_watermark, write_watermark
+from ical_module import read_ics_rows, write_ics
+from task_module import TaskCancelled, TaskRunner
+from render_cache_module import DayRenderCache
+from tenant_module import TenantRegistry
+
+# block_time's reply starts with this when the new event would double-book someone
+CONFLICT_MESSAGE = "Time conflicts with existing events"
+
+# Events are persisted here and loaded a window at a time
+SCHEDULE_DB = 'schedule.db'
+
+# Machine-oriented export formats and the file each one writes
+MACHINE_EXPORTS = {
+    "csv": "schedule.csv",
+    "jsonl": "schedule.jsonl",
+    "parquet": "schedule.parquet",
+    "arrow": "schedule.arrow",
+}
+
+# iCalendar export for other calendar tools; series are written once with their RRULE
+ICS_FILE = 'schedule.ics'
+
+# The file each export format writes
+EXPORT_FILES = dict(MACHINE_EXPORTS, excel='schedule.xlsx', word='schedule.docx', ics=ICS_FILE)
+
+# Worker threads for exports and bookings started from the GUI
+TASK_WORKERS = 2
+
+# Remembers when each export file was last written, for "since last export" mode
+EXPORT_STATE_FILE = 'export_state.json'
+
+# Accounts live in an indexed SQLite table; an old username,password CSV is migrated into it on startup
+USER_DB = 'users.db'
 USER_FILE = 'users.csv'
 
-# Function to load users from a CSV file
-def load_users():
-    if not os.path.exists(USER_FILE):
-        return {}
-    with open(USER_FILE, mode='r', newline='') as f:
-        reader = csv.reader(f)
-        return {rows[0]: rows[1] for rows in reader}
-
-# Function to save a new user to the CSV file
-def save_user(username, password):
-    with open(USER_FILE, mode='a', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([username, password])
+# Password hashing; raise the cost as hardware gets faster (see benchmarks.py login)
+PASSWORD_ALGORITHM = 'scrypt'
+PASSWORD_COST = 14
+AUTH_WORKERS = 2
+SESSION_TTL = 900  # seconds a login token stays valid
+
+# Outgoing mail settings; the environment overrides them, e.g. to point at a local test SMTP server
+SMTP_HOST = os.environ.get('SCHEDULER_SMTP_HOST', 'smtp.gmail.com')  # Change this if not using Gmail
+SMTP_PORT = int(os.environ.get('SCHEDULER_SMTP_PORT', '587'))
+SMTP_USE_TLS = os.environ.get('SCHEDULER_SMTP_TLS', '1') == '1'
+SMTP_POOL_SIZE = int(os.environ.get('SCHEDULER_SMTP_POOL_SIZE', '2'))  # concurrent SMTP sessions
+SENDER_EMAIL = os.environ.get('SCHEDULER_SENDER_EMAIL', 'sreeragvaddel@example.com')  # Replace with your email
+SENDER_PASSWORD = os.environ.get('SCHEDULER_SENDER_PASSWORD', 'yourpassword')  # Replace with your email password
+SMTP_TIMEOUT = 30  # seconds allowed for each SMTP command before the send fails
+# Sends per second allowed per SMTP account, in bursts of up to SMTP_BURST; 0 sends as fast as the server accepts
+SMTP_RATE = float(os.environ.get('SCHEDULER_SMTP_RATE', '1'))
+SMTP_BURST = int(os.environ.get('SCHEDULER_SMTP_BURST', '20'))
+# Retries of a message refused with a 4xx reply or a dropped connection, waiting about 2, 4, 8, 16 seconds between them
+SMTP_MAX_RETRIES = 4
+SMTP_RETRY_BASE = 2.0
+SMTP_RETRY_CAP = 60.0
+
+# Reminder delivery runs on worker threads so the scheduler thread only enqueues
+DELIVERY_WORKERS = 2
+DELIVERY_QUEUE_SIZE = 1000  # submit() blocks, then rejects, once this many reminders are waiting
+# Seconds a reminder may wait in the queue before it is dropped as stale, on top of its wait for SMTP_RATE
+DELIVERY_TIMEOUT = 300
+
+# How due reminders are announced on this machine: any of sound, desktop, log, or none
+NOTIFIER_BACKENDS = os.environ.get('SCHEDULER_NOTIFIER', 'sound,desktop').split(',')
+
+# Reminder emails and how long before the event each one is sent
+REMINDER_OFFSETS = {
+    "Reminder: Your event is tomorrow!": timedelta(days=1),
+    "Reminder: Your event is in 10 minutes!": timedelta(minutes=10),
+}
+
+# Recurring events with no COUNT/UNTIL are expanded this far ahead when a query has no end date
+RECURRENCE_HORIZON = timedelta(days=365)
+
+# Events starting within this window are loaded from the store so their reminders can be queued
+REMINDER_LOOKAHEAD = timedelta(days=2)
+REMINDER_REFILL_EVERY = timedelta(hours=1)
+
+# Reminders missed while no app was running are sent late only up to this lateness, and only before the event starts;
+# older ones are marked skipped. None sends every missed reminder that is still before its event.
+REMINDER_CATCH_UP = timedelta(hours=6)
+# A reminder still 'sending' after this long was cut off by a crash; it is marked failed rather than risk a second email
+REMINDER_SENDING_LEASE = timedelta(minutes=15)
+# Sent, failed and skipped reminders are kept in the outbox this long for inspection
+REMINDER_RETENTION = timedelta(days=30)
+# Missed reminders read from the outbox per batch during catch-up
+RECOVERY_BATCH = 500
+
+# Rows written to the store per transaction by bulk_load
+BULK_BATCH_SIZE = 10000
+
+# Queries spanning more days than this load the owner's whole schedule in one read
+LOAD_ALL_DAYS = 366
+
+# Days of formatted schedule text shared by the day views (show_day, view_schedule) and the Word export
+RENDER_CACHE_DAYS = 1024
+
+# Processes rendering months of the Word export; 1 renders in the exporting thread (see benchmarks.py word)
+WORD_EXPORT_WORKERS = 1
+
+# Users whose schedules stay loaded; idle ones beyond this are unloaded, least recently used first
+MAX_TENANTS = 32
+
+# Function to open the user store, importing the legacy CSV file the first time
+def load_users(hasher):
+    users = UserStore(USER_DB)
+    imported = users.migrate_from_csv(USER_FILE, hasher.hash)
+    if imported:
+        print(f"Migrated {imported} users from {USER_FILE}")
+    return users
+
+# Function to open the SMTP pool; connections are opened lazily on the first send and reused afterwards
+def make_mailer():
+    return SMTPConnectionPool(SMTP_HOST, SMTP_PORT, SENDER_EMAIL if SENDER_PASSWORD else None, SENDER_PASSWORD,
+                              use_tls=SMTP_USE_TLS, size=SMTP_POOL_SIZE, timeout=SMTP_TIMEOUT, rate=SMTP_RATE,
+                              burst=SMTP_BURST, max_retries=SMTP_MAX_RETRIES, retry_base=SMTP_RETRY_BASE,
+                              retry_cap=SMTP_RETRY_CAP)
+
+# Function to build the outbox key of a reminder; the same reminder always gets the same key, in any process
+def reminder_key(event, message):
+    return f"{event.event_id}/{event.date_time.isoformat()}/{int(REMINDER_OFFSETS[message].total_seconds())}"
+
+# Function to record the outcome of (event, message) reminders in the store's outbox
+def record_reminders(store, due, state, errors=None):
+    if store is None or not due:
+        return
+    errors = errors or [None] * len(due)
+    store.mark_reminders(((reminder_key(event, message), state if error is None else "failed", "" if error is None else str(error))
+                          for (event, message), error in zip(due, errors)), datetime.now().isoformat())
+
+# Function to send (event, message) reminders as one batch over pooled SMTP sessions
+def send_reminder_batch(mailer, due, notifier=None, store=None):
+    if not due:
+        return
+    if notifier is not None:
+        # Queued, not played here; a burst of reminders becomes one alert
+        for event, message in due:
+            notifier.notify(f"{event.name} at {event.start_hour}:00 - {message}")
+    messages = [(SENDER_EMAIL, event.email, build_reminder_email(event, message)) for event, message in due]
+    results = mailer.send_batch(messages)
+    for (event, message), error in zip(due, results):
+        if error is None:
+            print(f"Reminder email sent to {event.email}")
+        else:
+            print(f"Failed to send email: {error}")
+    record_reminders(store, due, "sent", results)
+
+# Function to give up on (event, message) reminders that were never sent, e.g. expired in the delivery queue
+def drop_reminders(mailer, due, store, reason):
+    if not due:
+        return
+    print(f"Dropped {len(due)} reminders: {reason}")
+    mailer.give_up([(SENDER_EMAIL, event.email, build_reminder_email(event, message)) for event, message in due],
+                   [reason] * len(due))
+    record_reminders(store, due, "failed", [reason] * len(due))
+
+# Function to create the email content for a reminder as a string ready for sendmail
+def build_reminder_email(event, message):
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = event.email
+    msg['Subject'] = f"Reminder: {event.name} event"
+
+    body = f"{message}\n\nEvent: {event.name}\nTime: {event.start_hour}:00 - {event.end_hour}:00\nDescription: {event.description}"
+    msg.attach(MIMEText(body, 'plain'))
+    return msg.as_string()
+
+# Function to build the per-user schedules; all tenants share one store, SMTP pool, delivery queue and notifier
+def make_tenants(store, notifier=None):
+    mailer = make_mailer()
+    notifier = notifier or make_notifier(NOTIFIER_BACKENDS, COALESCE_SECONDS)
+    delivery = DeliveryQueue(lambda due: send_reminder_batch(mailer, due, notifier, store), workers=DELIVERY_WORKERS,
+                             maxsize=DELIVERY_QUEUE_SIZE, timeout=DELIVERY_TIMEOUT, rate=SMTP_RATE,
+                             on_expired=lambda due: drop_reminders(mailer, due, store, "expired in the delivery queue"))
+    return TenantRegistry(lambda username: ScheduleBuilder(mailer, delivery, store, owner=username, notifier=notifier),
+                          store=store, max_tenants=MAX_TENANTS, lookahead=REMINDER_LOOKAHEAD, wake_every=REMINDER_REFILL_EVERY)
 
 class Event:
+    # Slots instead of a per-instance __dict__ keep each event small
+    __slots__ = ("start_hour", "end_hour", "name", "email", "description", "recurrence", "event_id",
+                 "date_time", "end_time", "updated_at", "rule", "master")
+
     def __init__(self, start_hour, end_hour, name, email, description="", recurrence=1):
         self.start_hour = start_hour
         self.end_hour = end_hour
-        self.name = name
-        self.email = email
+        # Names and emails repeat across many events; interning stores each distinct string once
+        self.name = sys.intern(name)
+        self.email = sys.intern(email)
         self.description = description
         self.recurrence = recurrence
+        self.event_id = None  # stable key in the schedule store
         self.date_time = None
+        self.end_time = None
+        self.updated_at = None  # when the event was created or last changed
+        self.rule = None  # RecurrenceRule for a recurring series, stored once
+        self.master = None  # for one occurrence of a series, the event holding the rule
+
+    def occurrence(self, start):
+        """A copy of this recurring event placed at the datetime `start`."""
+        occurrence = Event(self.start_hour, self.end_hour, self.name, self.email, self.description, self.recurrence)
+        occurrence.event_id = self.event_id
+        occurrence.updated_at = self.updated_at
+        occurrence.date_time = start
+        occurrence.end_time = start + (self.end_time - self.date_time)
+        occurrence.master = self
+        return occurrence
+
+# Function to turn a datetime into whole minutes since 0001-01-01, for compact integer columns
+def to_minutes(moment):
+    return moment.toordinal() * 1440 + moment.hour * 60 + moment.minute
+
+# Function to turn minutes since 0001-01-01 back into a datetime
+def from_minutes(minutes):
+    return datetime.fromordinal(minutes // 1440) + timedelta(minutes=minutes % 1440)
+
+class EventTable:
+    """Read-mostly struct-of-arrays snapshot of events, sorted by start time.
+
+    Each field is a column: typed arrays for the numbers, lists of interned
+    strings for the text. That avoids one object per event. Range lookups
+    bisect the start column. Event objects are only built for rows that are
+    actually read.
+    """
 
-class ScheduleBuilder:
     def __init__(self):
-        self.schedule = {}
-
-    def block_time(self, year, month, day, start_hour, end_hour, name, email, description="", recurrence=1):
-        date = (year, month, day)
-        event = Event(start_hour, end_hour, name, email, description, recurrence)
-        event.date_time = datetime(year, month, day, start_hour)
+        self.starts = array('q')  # start time in minutes since 0001-01-01
+        self.start_hours = array('b')
+        self.end_hours = array('b')
+        self.names = []
+        self.emails = []
+        self.descriptions = []
+        self.event_ids = []
+
+    @classmethod
+    def from_events(cls, events):
+        table = cls()
+        for event in sorted(events, key=lambda event: event.date_time):
+            table.append(event)
+        return table
+
+    def __len__(self):
+        return len(self.starts)
+
+    def append(self, event):
+        """Add an event; events must be appended in start order."""
+        start = to_minutes(event.date_time)
+        if self.starts and start < self.starts[-1]:
+            raise ValueError("EventTable rows must be appended in start order")
+        self.starts.append(start)
+        self.start_hours.append(event.start_hour)
+        self.end_hours.append(event.end_hour)
+        self.names.append(sys.intern(event.name))
+        self.emails.append(sys.intern(event.email))
+        self.descriptions.append(event.description)
+        self.event_ids.append(event.event_id)
+
+    def event(self, row):
+        """Build an Event for one row."""
+        event = Event(self.start_hours[row], self.end_hours[row], self.names[row], self.emails[row], self.descriptions[row])
+        event.event_id = self.event_ids[row]
+        event.date_time = from_minutes(self.starts[row])
+        event.end_time = event.date_time + timedelta(hours=event.end_hour - event.start_hour)
+        return event
+
+    def rows_between(self, start, end):
+        """Row numbers of events starting between two datetimes."""
+        return range(bisect.bisect_left(self.starts, to_minutes(start)), bisect.bisect_left(self.starts, to_minutes(end)))
+
+    def events_between(self, start, end):
+        """Yield Events starting between two datetimes, in start order."""
+        for row in self.rows_between(start, end):
+            yield self.event(row)
+
+    def nbytes(self):
+        """Approximate size of the columns themselves (shared strings counted once elsewhere)."""
+        return sum(sys.getsizeof(column) for column in (self.starts, self.start_hours, self.end_hours, self.names,
+                                                        self.emails, self.descriptions, self.event_ids))
 
-        if date not in self.schedule:
-            self.schedule[date] = []
-        self.schedule[date].append(event)
+class ScheduleBuilder:
+    def __init__(self, mailer=None, delivery=None, store=None, owner=None, notifier=None):
+        self.schedule = {}  # (year, month, day) -> {event_id: event}, so removal from a day is O(1)
+        self.events_by_id = {}  # event_id -> one-off event or recurring series
+        self.index = EventIndex()
+        self.recurring = set()  # events with a RecurrenceRule, expanded lazily per query
+        self.lock = threading.RLock()
+        # Called with the set of changed dates (None when any day may have changed) after each edit
+        self.listeners = []
+        # Formatted lines per day, invalidated through the listener above
+        self.render_cache = DayRenderCache(RENDER_CACHE_DAYS)
+        self.listeners.append(self.render_cache.invalidate)
+        # Optional ScheduleStore; events are read from it only for the days being viewed or reminded about
+        self.store = store
+        self.owner = owner
+        self._loaded_days = set()  # date ordinals already read from the store
+        self._fully_loaded = store is None
+        # Reminders due by this time are in the outbox; _queue_reminders records up to REMINDER_LOOKAHEAD ahead
+        self._outbox_horizon = datetime.now() + REMINDER_LOOKAHEAD
+        self.reminders = ReminderQueue(self.send_due_reminders, refill=self.load_upcoming if store is not None else None,
+                                       refill_every=REMINDER_REFILL_EVERY)
+        self.mailer = mailer or make_mailer()
+        self.notifier = notifier or make_notifier(NOTIFIER_BACKENDS, COALESCE_SECONDS)
+        self.delivery = delivery or DeliveryQueue(
+            self.deliver_reminders, workers=DELIVERY_WORKERS, maxsize=DELIVERY_QUEUE_SIZE, timeout=DELIVERY_TIMEOUT,
+            rate=SMTP_RATE, on_expired=lambda due: drop_reminders(self.mailer, due, self.store, "expired in the delivery queue"))
+
+    def block_time(self, year, month, day, start_hour, end_hour, name, email, description="", recurrence=1, rule=None,
+                   allow_conflicts=False):
+        event = self._make_event(year, month, day, start_hour, end_hour, name, email, description, recurrence, rule)
+
+        with self.lock:
+            if not allow_conflicts:
+                conflicts = self.find_conflicts(event)
+                if conflicts:
+                    lines = ["{}:00 - {}:00: {} on {}/{}/{}".format(other.start_hour, other.end_hour, other.name, other.date_time.month,
+                                                                    other.date_time.day, other.date_time.year) for other in conflicts[:10]]
+                    if len(conflicts) > 10:
+                        lines.append(f"... and {len(conflicts) - 10} more")
+                    return CONFLICT_MESSAGE + ":\n" + "\n".join(lines)
+            self._add_event(event)
+            if self.store is not None:
+                self.store.add(self._event_row(event))
+        self._notify(self._changed_days([event]))
 
         # Schedule email reminders
         self.schedule_email_reminders(event)
-        
-        # Handle recurrence
-        for i in range(1, recurrence):
-            self.block_time(year, month, day + i, start_hour, end_hour, name, email, description)
         return "Time blocked successfully!"
 
+    def _make_event(self, year, month, day, start_hour, end_hour, name, email, description="", recurrence=1, rule=None):
+        """Create a new Event with a fresh id, its times and its recurrence rule."""
+        event = Event(start_hour, end_hour, name, email, description, recurrence)
+        event.event_id = uuid.uuid4().hex
+        event.updated_at = datetime.now()
+        event.date_time = datetime(year, month, day, start_hour)
+        event.end_time = datetime(year, month, day) + timedelta(hours=end_hour)
+
+        # Handle recurrence: a series is one record holding a rule, expanded only when queried
+        if isinstance(rule, str):
+            rule = RecurrenceRule.from_rrule(rule)
+        if rule is None and recurrence > 1:
+            rule = RecurrenceRule("DAILY", count=recurrence)
+        event.rule = rule
+        return event
+
+    def bulk_load(self, rows, errors=None):
+        """Add many events at once from dicts keyed like block_time's arguments (plus optional "rrule" and "exdates").
+
+        Bad rows are skipped. A reader passes a row it could not parse as
+        the ValueError itself, so it is counted and reported like the others.
+        If `errors` is a list, a (row_number, message) pair is appended for
+        each one. The index is sorted once at the end,
+        the store is written BULK_BATCH_SIZE rows per transaction, and all
+        reminders are queued with one heapify. Conflict checks are not made.
+        Returns a summary message.
+        """
+        loaded = []
+        skipped = 0
+        for number, row in enumerate(rows, 1):
+            try:
+                if isinstance(row, ValueError):
+                    raise row
+                start_hour, end_hour = int(row["start_hour"]), int(row["end_hour"])
+                if not 0 <= start_hour < end_hour <= 24:
+                    raise ValueError(f"hours must satisfy 0 <= start < end <= 24, got {start_hour}-{end_hour}")
+                if not row["name"] or not row["email"]:
+                    raise ValueError("name and email are required")
+                loaded.append(self._make_event(int(row["year"]), int(row["month"]), int(row["day"]), start_hour, end_hour,
+                                               str(row["name"]), str(row["email"]), row.get("description") or "",
+                                               int(row.get("recurrence") or 1), row.get("rrule") or None))
+                if row.get("exdates") and loaded[-1].rule is not None:
+                    loaded[-1].rule.exdates.update(row["exdates"])
+            except KeyError as e:
+                skipped += 1
+                if errors is not None:
+                    errors.append((number, f"missing column {e}"))
+            except (TypeError, ValueError) as e:
+                skipped += 1
+                if errors is not None:
+                    errors.append((number, str(e)))
+
+        with self.lock:
+            for event in loaded:
+                self._add_event(event, index=False)
+            self.index.add_many(event for event in loaded if event.rule is None)
+            if self.store is not None:
+                for start in range(0, len(loaded), BULK_BATCH_SIZE):
+                    self.store.add_many(self._event_row(event) for event in loaded[start:start + BULK_BATCH_SIZE])
+        if loaded:
+            self._notify(self._changed_days(loaded))
+        now = datetime.now()
+        self._queue_reminders(entry for event in loaded for entry in self._reminder_entries(event, now))
+
+        result = f"Loaded {len(loaded)} events"
+        if skipped:
+            result += f", skipped {skipped} invalid rows"
+        return result + "."
+
+    def import_file(self, path, errors=None, default_email=""):
+        """bulk_load() events from a .csv, .json, .jsonl or .ics file.
+
+        iCalendar events without an ORGANIZER or ATTENDEE email get `default_email`.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            rows = read_csv_rows(path)
+        elif extension in (".ics", ".ical"):
+            rows = read_ics_rows(path, default_email, errors)
+        else:
+            rows = read_json_rows(path)
+        return self.bulk_load(rows, errors)
+
+    def find_conflicts(self, event):
+        """Existing events that overlap `event`, or any occurrence of it if it recurs."""
+        if event.rule is None:
+            return self.overlapping(event.date_time, event.end_time)
+        conflicts = []
+        duration = event.end_time - event.date_time
+        window_start, window_end = self._series_window(event, None, None)
+        for start in event.rule.occurrences(event.date_time, window_start, window_end):
+            conflicts.extend(self.overlapping(start, start + duration))
+        return conflicts
+
+    def find_free_slots(self, date_range, duration, working_hours=(9, 17), others=()):
+        """Free (start, end) datetime ranges at least `duration` long, within working hours.
+
+        `date_range` is a (first_day, last_day) pair of dates, both included.
+        `duration` is a timedelta or a number of hours. Pass other users'
+        ScheduleBuilders in `others` to find times that suit everyone: their
+        busy intervals are merged with this calendar's before the sweep.
+        Sorting the busy intervals is O(n log n); the sweep itself is linear.
+        """
+        if not isinstance(duration, timedelta):
+            duration = timedelta(hours=duration)
+        first_day, last_day = date_range
+        range_start = datetime(first_day.year, first_day.month, first_day.day)
+        range_end = datetime(last_day.year, last_day.month, last_day.day) + timedelta(days=1)
+
+        # Busy intervals from every calendar, merged into disjoint [start, end] ranges
+        busy = heapq.merge(*[sorted((event.date_time, event.end_time) for event in builder.overlapping(range_start, range_end))
+                             for builder in (self, *others)])
+        merged = []
+        for start, end in busy:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        slots = []
+        busy_index = 0
+        day = range_start
+        while day < range_end:
+            window_start = day + timedelta(hours=working_hours[0])
+            window_end = day + timedelta(hours=working_hours[1])
+            while busy_index < len(merged) and merged[busy_index][1] <= window_start:
+                busy_index += 1
+            cursor = window_start
+            scan = busy_index
+            while scan < len(merged) and merged[scan][0] < window_end:
+                if merged[scan][0] - cursor >= duration:
+                    slots.append((cursor, merged[scan][0]))
+                cursor = max(cursor, merged[scan][1])
+                scan += 1
+            if window_end - cursor >= duration:
+                slots.append((cursor, window_end))
+            day += timedelta(days=1)
+        return slots
+
+    def _add_event(self, event, index=True):
+        """Put an event into the id map, the day map and (unless a bulk load sorts it in later) the index."""
+        if event.rule is not None:
+            self.recurring.add(event)
+        else:
+            date = (event.date_time.year, event.date_time.month, event.date_time.day)
+            if date not in self.schedule:
+                self.schedule[date] = {}
+            self.schedule[date][event.event_id] = event
+            if index:
+                self.index.add(event)
+        self.events_by_id[event.event_id] = event
+
+    def _remove_event(self, event):
+        """Take an event out of the id map, the day map and the index."""
+        if event.rule is not None:
+            self.recurring.discard(event)
+        else:
+            date = (event.date_time.year, event.date_time.month, event.date_time.day)
+            day_events = self.schedule.get(date)
+            if day_events is not None:
+                day_events.pop(event.event_id, None)
+                if not day_events:
+                    del self.schedule[date]
+            self.index.remove(event)
+        self.events_by_id.pop(event.event_id, None)
+
+    def add_listener(self, callback):
+        """Call callback(dates) after events are added, changed or deleted.
+
+        `dates` is a set of datetime.date, or None when a recurring series
+        changed and any day may be affected. Callbacks run on the thread that
+        made the change, so GUI listeners should only record the dates.
+        """
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _changed_days(self, events):
+        """The dates the events fall on, or None if any of them is a recurring series."""
+        days = set()
+        for event in events:
+            if event.rule is not None:
+                return None
+            days.add(event.date_time.date())
+        return days
+
+    def _notify(self, dates):
+        for listener in list(self.listeners):
+            listener(dates)
+
+    def get_event(self, event_id):
+        """The event or recurring series with this id, read from the store if needed; None if there is none."""
+        with self.lock:
+            event = self.events_by_id.get(event_id)
+            if event is not None or self._fully_loaded:
+                return event
+            # Only some days are in memory; one primary-key read finds events on the others
+            row = self.store.get(event_id, self.owner)
+            if row is None:
+                return None
+            event = self._event_from_row(row)
+            self._add_event(event)
+            self.schedule_email_reminders(event)
+            return event
+
+    def delete_event_by_id(self, event_id):
+        """Delete an event, or a whole recurring series, by id and cancel its reminders."""
+        with self.lock:
+            event = self.get_event(event_id)
+            if event is None:
+                return "Event not found!"
+            self._remove_event(event)
+            if self.store is not None:
+                self.store.delete(event_id)
+        self._notify(self._changed_days([event]))
+        self._cancel_reminders(event_id)
+        return "Event deleted successfully!"
+
+    def update_event(self, event_id, **changes):
+        """Change fields of an event by id.
+
+        Accepts name, email, description, start_hour, end_hour and day (a
+        date). Moving an event re-indexes it and re-plans its reminders.
+        """
+        unknown = set(changes) - {"name", "email", "description", "start_hour", "end_hour", "day"}
+        if unknown:
+            raise ValueError(f"Cannot update {', '.join(sorted(unknown))}")
+        with self.lock:
+            event = self.get_event(event_id)
+            if event is None:
+                return "Event not found!"
+            moved = bool({"start_hour", "end_hour", "day"} & set(changes))
+            changed = self._changed_days([event])
+            if moved:
+                self._remove_event(event)
+            for field in ("name", "email"):
+                if field in changes:
+                    setattr(event, field, sys.intern(changes[field]))
+            if "description" in changes:
+                event.description = changes["description"]
+            if moved:
+                day = changes.get("day", event.date_time.date())
+                event.start_hour = changes.get("start_hour", event.start_hour)
+                event.end_hour = changes.get("end_hour", event.end_hour)
+                event.date_time = datetime(day.year, day.month, day.day, event.start_hour)
+                event.end_time = datetime(day.year, day.month, day.day) + timedelta(hours=event.end_hour)
+                self._add_event(event)
+            event.updated_at = datetime.now()
+            if self.store is not None:
+                row = self._event_row(event)
+                del row["event_id"]
+                self.store.update(event_id, **row)
+        new_days = self._changed_days([event])
+        self._notify(None if changed is None or new_days is None else changed | new_days)
+        if moved:
+            self._cancel_reminders(event_id)
+            self.schedule_email_reminders(event)
+        return "Event updated successfully!"
+
+    def _event_row(self, event):
+        """The schedule store row for an event."""
+        rule = event.rule
+        last = rule.last_start(event.date_time) if rule is not None else None
+        return {
+            "event_id": event.event_id, "owner": self.owner, "date": event.date_time.date().isoformat(),
+            "start_hour": event.start_hour, "end_hour": event.end_hour, "name": event.name, "email": event.email,
+            "description": event.description, "recurrence": event.recurrence,
+            "rrule": rule.to_rrule() if rule is not None else None,
+            "last_date": last.date().isoformat() if last is not None else None,
+            "exdates": self._exdates_value(rule) if rule is not None else "",
+            "updated_at": event.updated_at.isoformat(),
+        }
+
+    def _exdates_value(self, rule):
+        return ",".join(sorted(start.isoformat() for start in rule.exdates))
+
+    def _event_from_row(self, row):
+        """Rebuild an event from a schedule store row."""
+        event = Event(row["start_hour"], row["end_hour"], row["name"], row["email"], row["description"], row["recurrence"])
+        event.event_id = row["event_id"]
+        day = datetime.fromisoformat(row["date"])
+        event.date_time = day + timedelta(hours=row["start_hour"])
+        event.end_time = day + timedelta(hours=row["end_hour"])
+        if row["rrule"]:
+            event.rule = RecurrenceRule.from_rrule(row["rrule"])
+            event.rule.exdates = {datetime.fromisoformat(start) for start in row["exdates"].split(",") if start}
+        event.updated_at = datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None
+        return event
+
+    def _ensure_loaded(self, start, end):
+        """Read events between two datetimes from the store unless those days are already in memory."""
+        if self._fully_loaded:
+            return
+        loaded = []
+        with self.lock:
+            first = max(start, datetime.min + timedelta(days=1)).date().toordinal()
+            last = (end - timedelta(microseconds=1)).date().toordinal()
+            if last - first > LOAD_ALL_DAYS:
+                rows = self.store.load_all(self.owner)
+                self._fully_loaded = True
+            else:
+                missing = [day for day in range(first, last + 1) if day not in self._loaded_days]
+                if not missing:
+                    return
+                rows = self.store.load_between(Date.fromordinal(missing[0]).isoformat(),
+                                               Date.fromordinal(missing[-1]).isoformat(), self.owner)
+                self._loaded_days.update(range(missing[0], missing[-1] + 1))
+            for row in rows:
+                if row["event_id"] not in self.events_by_id:
+                    event = self._event_from_row(row)
+                    self._add_event(event, index=False)
+                    loaded.append(event)
+            self.index.add_many(event for event in loaded if event.rule is None)
+        if loaded:
+            now = datetime.now()
+            self._queue_reminders(entry for event in loaded for entry in self._reminder_entries(event, now))
+
+    def load_upcoming(self):
+        """Load events starting soon from the store, queueing their reminders, then catch up on missed ones.
+
+        Every queued reminder due within REMINDER_LOOKAHEAD is recorded in
+        the outbox, so a restart can tell which reminders it missed.
+        """
+        now = datetime.now()
+        self._ensure_loaded(now, now + REMINDER_LOOKAHEAD)
+        if self.store is not None:
+            # Queued reminders that have come within the window since the last pass
+            horizon = now + REMINDER_LOOKAHEAD
+            self.store.add_reminders(self._outbox_row(event, message)
+                                     for _, event, message in self.reminders.pending_until(horizon, self._outbox_horizon))
+            self._outbox_horizon = horizon
+            self.catch_up_reminders(now)
+
+    def catch_up_reminders(self, now=None):
+        """Send or skip outbox reminders that came due while no app was running. Returns how many were sent.
+
+        Due rows are read by fire time, latest first, RECOVERY_BATCH at a
+        time. Of several missed reminders for one occurrence only the latest
+        is sent; it is skipped too if the event has started or it is more
+        than REMINDER_CATCH_UP late. Reminders left 'sending' by a crash are
+        marked failed rather than sent again.
+        """
+        if self.store is None:
+            return 0
+        now = now or datetime.now()
+        moment = now.isoformat()
+        self.store.abandon_reminders((now - REMINDER_SENDING_LEASE).isoformat(), moment, self.owner)
+        self.store.purge_reminders((now - REMINDER_RETENTION).isoformat(), self.owner)
+        seen = set()  # (event_id, occurrence) already sent or skipped in this pass
+        sent = 0
+        while True:
+            rows = self.store.due_reminders(moment, self.owner, RECOVERY_BATCH)
+            if not rows:
+                return sent
+            # One store read for every day this batch's reminders are about
+            occurrences = [datetime.fromisoformat(row["occurrence"]) for row in rows]
+            self._ensure_loaded(min(occurrences), max(occurrences) + timedelta(days=1))
+            due, skipped = [], []
+            for row, occurrence in zip(rows, occurrences):
+                event = self._reminded_event(row["event_id"], occurrence)
+                if event is None or row["message"] not in REMINDER_OFFSETS \
+                        or reminder_key(event, row["message"]) != row["reminder_key"]:
+                    skipped.append((row["reminder_key"], "skipped", "event deleted or changed"))
+                elif (row["event_id"], occurrence) in seen:
+                    skipped.append((row["reminder_key"], "skipped", "superseded by a later reminder"))
+                elif occurrence <= now or (REMINDER_CATCH_UP is not None
+                                           and now - datetime.fromisoformat(row["fire_at"]) > REMINDER_CATCH_UP):
+                    skipped.append((row["reminder_key"], "skipped", "missed"))
+                else:
+                    due.append((event, row["message"]))
+                seen.add((row["event_id"], occurrence))
+            self.store.mark_reminders(skipped, moment)
+            sent += self._submit_reminders(due)
+
+    def _reminded_event(self, event_id, occurrence):
+        """The event, or occurrence of a series, starting at `occurrence`; None if it no longer exists."""
+        event = self.get_event(event_id)
+        if event is None:
+            return None
+        if event.rule is None:
+            return event if event.date_time == occurrence else None
+        if event.rule.next_after(event.date_time, occurrence - timedelta(microseconds=1)) != occurrence:
+            return None
+        return event.occurrence(occurrence)
+
+    def events_between(self, start, end):
+        """Return events starting between two datetimes, ordered by start time."""
+        self._ensure_loaded(start, end)
+        with self.lock:
+            events = self.index.events_between(start, end)
+            occurrences = self._occurrences(start, end)
+        if not occurrences:
+            return events
+        return list(heapq.merge(events, occurrences, key=lambda event: event.date_time))
+
+    def overlapping(self, start, end):
+        """Return events that overlap the time range between two datetimes."""
+        self._ensure_loaded(start - timedelta(days=1), end)
+        with self.lock:
+            events = self.index.overlapping(start, end)
+            for master in self.recurring:
+                duration = master.end_time - master.date_time
+                for occurrence_start in master.rule.occurrences(master.date_time, start - duration, end):
+                    if occurrence_start + duration > start:
+                        events.append(master.occurrence(occurrence_start))
+        return events
+
+    def events_on(self, date):
+        """Return the events on a (year, month, day) date, including occurrences of recurring events."""
+        day_start = datetime(*date)
+        self._ensure_loaded(day_start, day_start + timedelta(days=1))
+        with self.lock:
+            occurrences = self._occurrences(day_start, day_start + timedelta(days=1))
+            return list(self.schedule.get(date, {}).values()) + occurrences
+
+    def iter_events(self, start=None, end=None):
+        """Yield (date, event) pairs in start order, expanding recurring events.
+
+        With no start/end every event is included. Occurrences are generated
+        one at a time, so only the one-off events are held in a list.
+        """
+        self._ensure_loaded(start or datetime.min, end or datetime.max)
+        # Snapshot under the lock: exports iterate on a worker thread while the GUI keeps editing
+        with self.lock:
+            one_offs = self.index.events_between(start or datetime.min, end or datetime.max)
+            masters = list(self.recurring)
+        return self._expand(one_offs, masters, start, end)
+
+    def changed_since(self, moment, start=None, end=None):
+        """Like iter_events(), but only events created or changed after the datetime `moment`.
+
+        With a store this is an indexed query on updated_at, and nothing is
+        loaded into memory. Deletions of one-off events are not reported.
+        """
+        if self.store is not None:
+            events = [self._event_from_row(row) for row in self.store.load_changed_since(moment.isoformat(), self.owner)]
+        else:
+            with self.lock:
+                events = [event for event in self.index.events_between(datetime.min, datetime.max) if event.updated_at > moment]
+                events += [master for master in self.recurring if master.updated_at > moment]
+        one_offs = [event for event in events if event.rule is None
+                    and (start is None or event.date_time >= start) and (end is None or event.date_time < end)]
+        one_offs.sort(key=lambda event: event.date_time)
+        return self._expand(one_offs, [event for event in events if event.rule is not None], start, end)
+
+    def _expand(self, one_offs, masters, start, end):
+        """Merge start-sorted one-off events with lazily expanded series into (date, event) pairs."""
+        for event in heapq.merge(one_offs, *self._series_windows(masters, start, end), key=lambda event: event.date_time):
+            yield (event.date_time.year, event.date_time.month, event.date_time.day), event
+
+    def to_table(self, start=None, end=None):
+        """Snapshot events (with series expanded) into a compact EventTable."""
+        table = EventTable()
+        for _, event in self.iter_events(start, end):
+            table.append(event)
+        return table
+
+    def count_events(self, start=None, end=None):
+        """Number of events iter_events() would yield, without creating occurrence objects."""
+        self._ensure_loaded(start or datetime.min, end or datetime.max)
+        with self.lock:
+            count = len(self.index.events_between(start or datetime.min, end or datetime.max))
+            masters = list(self.recurring)
+        for master in masters:
+            window_start, window_end = self._series_window(master, start, end)
+            count += sum(1 for _ in master.rule.occurrences(master.date_time, window_start, window_end))
+        return count
+
+    def iter_series(self, start=None, end=None):
+        """Yield one-off events and recurring masters (not their occurrences) that fall between two datetimes, by start."""
+        self._ensure_loaded(start or datetime.min, end or datetime.max)
+        with self.lock:
+            one_offs = self.index.events_between(start or datetime.min, end or datetime.max)
+            masters = []
+            for master in self.recurring:
+                last = master.rule.last_start(master.date_time)
+                if (end is None or master.date_time < end) and (start is None or last is None or last >= start):
+                    masters.append(master)
+        masters.sort(key=lambda event: event.date_time)
+        return heapq.merge(one_offs, masters, key=lambda event: event.date_time)
+
+    def _complete_until(self, end):
+        """iter_events(start, end) yields every event before this datetime; endless series stop at their horizon."""
+        if end is not None:
+            return end
+        with self.lock:
+            masters = list(self.recurring)
+        return min((self._series_window(master, None, None)[1] for master in masters), default=datetime.max)
+
+    def _series_window(self, master, start, end):
+        """The [start, end) window to expand a series over; endless series stop at RECURRENCE_HORIZON."""
+        if end is None:
+            end = datetime.max if master.rule.is_finite() else max(datetime.now(), master.date_time) + RECURRENCE_HORIZON
+        return start or master.date_time, end
+
+    def _series_windows(self, masters, start, end):
+        """One lazy, start-ordered occurrence generator per recurring series."""
+        generators = []
+        for master in masters:
+            window_start, window_end = self._series_window(master, start, end)
+            generators.append(master.occurrence(occurrence_start)
+                              for occurrence_start in master.rule.occurrences(master.date_time, window_start, window_end))
+        return generators
+
+    def _occurrences(self, start, end):
+        """Occurrences of recurring events starting between two datetimes, sorted by start."""
+        occurrences = [master.occurrence(occurrence_start)
+                       for master in self.recurring
+                       for occurrence_start in master.rule.occurrences(master.date_time, start, end)]
+        occurrences.sort(key=lambda event: event.date_time)
+        return occurrences
+
     def schedule_email_reminders(self, event):
         """Schedule emails to be sent 1 day and 10 minutes before the event."""
-        event_time = event.date_time
-        day_before = event_time - timedelta(days=1)
-        ten_minutes_before = event_time - timedelta(minutes=10)
-
-        # Scheduling day-before reminder
-        schedule.every().day.at(day_before.strftime("%H:%M")).do(self.send_email_reminder, event, "Reminder: Your event is tomorrow!")
-
-        # Scheduling 10-minutes-before reminder
-        schedule.every().day.at(ten_minutes_before.strftime("%H:%M")).do(self.send_email_reminder, event, "Reminder: Your event is in 10 minutes!")
+        self._queue_reminders(self._reminder_entries(event, datetime.now()))
+
+    def _queue_reminders(self, entries):
+        """Queue (fire_time, event, message, key) reminders; those due within REMINDER_LOOKAHEAD also go in the outbox."""
+        entries = list(entries)
+        if self.store is not None:
+            horizon = datetime.now() + REMINDER_LOOKAHEAD
+            rows = [self._outbox_row(event, message) for fire_time, event, message, _ in entries if fire_time <= horizon]
+            if rows:
+                self.store.add_reminders(rows)
+        self.reminders.add_many(entries)
+
+    def _cancel_reminders(self, event_id):
+        """Cancel the queued reminders of an event or series, in memory and in the outbox."""
+        self.reminders.cancel(event_id)
+        if self.store is not None:
+            self.store.cancel_reminders(event_id)
+
+    def _outbox_row(self, event, message):
+        """The outbox row of one reminder of an event or occurrence."""
+        return {
+            "reminder_key": reminder_key(event, message), "owner": self.owner, "event_id": event.event_id,
+            "occurrence": event.date_time.isoformat(), "message": message,
+            "fire_at": (event.date_time - REMINDER_OFFSETS[message]).isoformat(), "updated_at": datetime.now().isoformat(),
+        }
+
+    def _reminder_entries(self, event, after):
+        """(fire_time, event, message, key) for each kind of reminder of `event` still to come."""
+        for message, offset in REMINDER_OFFSETS.items():
+            entry = self._next_reminder(event, message, offset, after)
+            if entry is not None:
+                yield entry
+
+    def _next_reminder(self, event, message, offset, after):
+        """The next reminder of one kind that fires after `after`, or None (one-shot, skipped if already past)."""
+        if event.rule is None:
+            if event.date_time - offset > after:
+                return event.date_time - offset, event, message, event.event_id
+            return None
+        # For a series only the next occurrence is queued; the one after is queued when it fires
+        start = event.rule.next_after(event.date_time, after + offset)
+        if start is not None:
+            return start - offset, event.occurrence(start), message, event.event_id
+        return None
+
+    def send_due_reminders(self, due):
+        """Hand due (event, message) reminders to the delivery workers without waiting for them."""
+        following = []
+        for event, message in due:
+            if event.master is not None and self.events_by_id.get(event.event_id) is event.master:
+                offset = REMINDER_OFFSETS[message]
+                entry = self._next_reminder(event.master, message, offset, event.date_time - offset)
+                if entry is not None:
+                    following.append(entry)
+        self._queue_reminders(following)
+        self._submit_reminders(due)
+
+    def _submit_reminders(self, due):
+        """Claim reminders in the outbox and queue the claimed ones for delivery. Returns how many were queued.
+
+        Another thread or process that claimed a reminder first sends it instead, so none is sent twice.
+        """
+        if self.store is not None and due:
+            claimed = set(self.store.claim_reminders(self._outbox_row(event, message) for event, message in due))
+            due = [(event, message) for event, message in due if reminder_key(event, message) in claimed]
+        rejected = [reminder for reminder in due if not self.delivery.submit(reminder)]
+        drop_reminders(self.mailer, rejected, self.store, "delivery queue full")
+        return len(due) - len(rejected)
+
+    def deliver_reminders(self, due):
+        """Send (event, message) reminders as one batch over pooled SMTP sessions."""
+        send_reminder_batch(self.mailer, due, self.notifier, self.store)
 
     def send_email_reminder(self, event, message):
         """Sends an email reminder."""
-        try:
-            self.play_notification_sound()  # Play notification sound before sending email
-            sender_email = "sreeragvaddel@example.com"  # Replace with your email
-            sender_password = "yourpassword"  # Replace with your email password
-
-            # Create the email content
-            msg = MIMEMultipart()
-            msg['From'] = sender_email
-            msg['To'] = event.email
-            msg['Subject'] = f"Reminder: {event.name} event"
-
-            body = f"{message}\n\nEvent: {event.name}\nTime: {event.start_hour}:00 - {event.end_hour}:00\nDescription: {event.description}"
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Setup the SMTP server
-            server = smtplib.SMTP('smtp.gmail.com', 587)  # Change this if not using Gmail
-            server.starttls()
-            server.login(sender_email, sender_password)
-            text = msg.as_string()
-            server.sendmail(sender_email, event.email, text)
-            server.quit()
+        self.deliver_reminders([(event, message)])
 
-            print(f"Reminder email sent to {event.email}")
-        except Exception as e:
-            print(f"Failed to send email: {e}")
+    def build_reminder_email(self, event, message):
+        """Create the email content for a reminder as a string ready for sendmail."""
+        return build_reminder_email(event, message)
+
+    def render_day(self, events):
+        """Formatted (line, description) pairs for one day's events, in start order."""
+        return tuple(("{}:00 - {}:00: {} (Email: {})".format(event.start_hour, event.end_hour, event.name, event.email),
+                      event.description) for event in sorted(events, key=lambda event: event.date_time))
 
-    def play_notification_sound(self):
-        duration = 1000  # milliseconds
-        frequency = 440  # Hz
-        winsound.Beep(frequency, duration)
+    def rendered_day(self, day):
+        """render_day() output for a date, shared through the render cache by the day views and the Word export."""
+        return self.render_cache.get(day, lambda: self.render_day(self.events_on((day.year, day.month, day.day))))
 
     def view_schedule(self, year, month, day):
-        date = (year, month, day)
-        if date in self.schedule:
-            events = ["{}:00 - {}:00: {} (Email: {})".format(event.start_hour, event.end_hour, event.name, event.email) for event in self.schedule[date]]
-            return "\n".join(events)
+        rendered = self.rendered_day(Date(year, month, day))
+        if rendered:
+            return "\n".join(line for line, _ in rendered)
         else:
             return "No events scheduled for {}/{}/{}".format(month, day, year)
 
     def delete_event(self, year, month, day, start_hour, name):
         date = (year, month, day)
-        if date in self.schedule:
-            for event in self.schedule[date]:
+        day_events = self.events_on(date)
+        if day_events:
+            for event in day_events:
                 if event.start_hour == start_hour and event.name == name:
-                    self.schedule[date].remove(event)
-                    return "Event deleted successfully!"
+                    with self.lock:
+                        if event.master is not None:
+                            # One occurrence of a series: exclude it from the rule and re-plan the series' reminders
+                            master = event.master
+                            master.rule.exdates.add(event.date_time)
+                            master.updated_at = datetime.now()
+                            if self.store is not None:
+                                self.store.update(master.event_id, exdates=self._exdates_value(master.rule),
+                                                  updated_at=master.updated_at.isoformat())
+                            self._cancel_reminders(master.event_id)
+                            self.schedule_email_reminders(master)
+                            self._notify({event.date_time.date()})
+                            return "Event deleted successfully!"
+                    return self.delete_event_by_id(event.event_id)
             return "Event not found!"
         else:
             return "No events found for {}/{}/{}".format(month, day, year)
 
-    def export_schedule(self, format="excel"):
+    def export_schedule(self, format="excel", start=None, end=None, progress=None, since_last=False, directory=None):
+        """Export events starting between two datetimes (default: all) to a schedule.* file in `directory` (default: cwd).
+
+        Formats: excel and word for people; ics for other calendar tools; csv,
+        jsonl, parquet and arrow for analytics. `progress(done, total)` is
+        called as rows are written. With `since_last`, the machine formats
+        contain only events changed since the previous export to the same file.
+
+        The file is written under a temporary name and renamed once complete,
+        so a failed export, or one cancelled by raising TaskCancelled from
+        `progress`, leaves the previous export in place.
+        """
+        path = EXPORT_FILES.get(format)
+        if path is None:
+            return f"Unsupported export format: {format}"
+        if directory is not None:
+            path = os.path.join(directory, path)
+        root, extension = os.path.splitext(path)
+        # Unique per export, so concurrent exports of the same file can't write into each other
+        partial = f"{root}.{uuid.uuid4().hex[:8]}.partial{extension}"
+        exported_at = datetime.now()
+        # Watermarks are per user: each user's export holds only their own events
+        state_key = path if self.owner is None else f"{self.owner}/{path}"
+        watermark = read_watermark(EXPORT_STATE_FILE, state_key) if since_last and format in MACHINE_EXPORTS else None
+        try:
+            count = self._write_export(format, partial, start, end, progress, watermark)
+            os.replace(partial, path)
+        except ImportError:
+            return f"Exporting {format} needs pyarrow (pip install pyarrow)."
+        except TaskCancelled:
+            return "Export cancelled."
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        if format in MACHINE_EXPORTS:
+            write_watermark(EXPORT_STATE_FILE, state_key, exported_at)
+        return f"Exported {count} events to {path} successfully!"
+
+    def _write_export(self, format, path, start, end, progress, watermark):
+        """Write one export file and return how many events it holds."""
+        if format == "ics":
+            return write_ics(self.iter_series(start, end), path, progress=progress)
+
+        events = self.changed_since(watermark, start, end) if watermark else self.iter_events(start, end)
+        total = self.count_events(start, end) if progress is not None and watermark is None else None
+        if format == "csv":
+            return export_csv(events, path, progress=progress, total=total)
+        if format == "jsonl":
+            return export_jsonl(events, path, progress=progress, total=total)
+        if format in ("parquet", "arrow"):
+            return export_columnar(events, path, file_format=format, progress=progress, total=total)
         if format == "excel":
-            data = []
-            for date, events in self.schedule.items():
-                for event in events:
-                    data.append([date[0], date[1], date[2], event.start_hour, event.end_hour, event.name, event.email, event.description])
-            df = pd.DataFrame(data, columns=["Year", "Month", "Day", "Start Hour", "End Hour", "Name", "Email", "Description"])
-            df.to_excel("schedule.xlsx", index=False)
-            return "Schedule exported to schedule.xlsx successfully!"
-        
-        elif format == "word":
-            doc = Document()
-            doc.add_heading('Schedule', level=1)
-
-            for date, events in self.schedule.items():
-                doc.add_heading(f"Date: {date[1]}/{date[2]}/{date[0]}", level=2)
-                for event in events:
-                    doc.add_paragraph(f"{event.start_hour}:00 - {event.end_hour}:00: {event.name} (Email: {event.email})")
-                    if event.description:
-                        doc.add_paragraph(f"Description: {event.description}")
-
-            doc.save("schedule.docx")
-            return "Schedule exported to schedule.docx successfully!"
+            # Rows are streamed to the workbook, so memory does not grow with the schedule
+            return export_excel(events, path, progress=progress, total=total)
+
+        from word_export_module import export_word
+        return export_word(self._rendered_days(events, start, end), path, workers=WORD_EXPORT_WORKERS,
+                           progress=progress, total=total)
+
+    def _rendered_days(self, events, start, end):
+        """Group (date, event) pairs into (date, render_day() output) pairs.
+
+        Days rendered_day() has already rendered are reused from the cache, but
+        nothing is stored: `events` was read before the cache versions, so a
+        day changed since would be cached stale under its new version.
+        """
+        complete_until = self._complete_until(end)
+        for date, day_events in groupby(events, key=lambda item: item[0]):
+            day_start = datetime(*date)
+            # Only days the export covers completely can match rendered_day()
+            rendered = None
+            if (start is None or start <= day_start) and day_start + timedelta(days=1) <= complete_until:
+                rendered = self.render_cache.peek(Date(*date))
+            yield date, rendered if rendered is not None else self.render_day(event for _, event in day_events)
 
 
 class App:
     def __init__(self, root):
-        self.builder = ScheduleBuilder()
+        # Tk is imported by the App's methods only, so service_module runs on servers without python3-tk
+        import tkinter as tk
+
+        # One schedule per user, loaded at login and unloaded when idle
+        self.tenants = make_tenants(ScheduleStore(SCHEDULE_DB))
         self.root = root
         self.root.title("Schedule Manager")
 
-        self.users = load_users()
+        # Hashing runs on the authenticator's worker threads so the Tk loop never blocks on it
+        hasher = PasswordHasher(PASSWORD_ALGORITHM, PASSWORD_COST)
+        self.auth = Authenticator(load_users(hasher), hasher, workers=AUTH_WORKERS, session_ttl=SESSION_TTL)
         self.current_user = None
+        self.session_token = None
+        # Exports and bookings run here so a big export or long series doesn't freeze the window
+        self.tasks = TaskRunner(root, workers=TASK_WORKERS)
 
         # Main Title
         self.label = tk.Label(root, text="Schedule Manager", font=('Helvetica', 16))
@@ -189,7 +1106,15 @@ class App:
         self.export_button = tk.Button(root, text="Export Schedule", command=self.export_schedule_gui, state='disabled')
         self.export_button.pack(pady=5)
 
+    @property
+    def builder(self):
+        """The logged-in user's ScheduleBuilder."""
+        return self.tenants.get(self.current_user)
+
     def create_account_gui(self):
+        import tkinter as tk
+        from tkinter import messagebox
+
         account_window = tk.Toplevel(self.root)
         account_window.title("Create Account")
 
@@ -204,11 +1129,15 @@ class App:
         def create_account_action():
             username = username_entry.get()
             password = password_entry.get()
-            if username in self.users:
+            create_account_button.config(state='disabled')
+            self.when_done(self.auth.create_account_async(username, password), account_created)
+
+        def account_created(created):
+            # The insert is atomic, so two instances can't both create the same user
+            create_account_button.config(state='normal')
+            if not created:
                 messagebox.showerror("Error", "Username already exists.")
             else:
-                save_user(username, password)
-                self.users[username] = password  # Update the in-memory user list
                 messagebox.showinfo("Success", "Account created successfully!")
                 account_window.destroy()
 
@@ -216,6 +1145,9 @@ class App:
         create_account_button.grid(row=2, columnspan=2, pady=10)
 
     def login_gui(self):
+        import tkinter as tk
+        from tkinter import messagebox
+
         login_window = tk.Toplevel(self.root)
         login_window.title("Login")
 
@@ -230,8 +1162,18 @@ class App:
         def login_action():
             username = username_entry.get()
             password = password_entry.get()
-            if username in self.users and self.users[username] == password:
+            login_button.config(state='disabled')
+            self.when_done(self.auth.login_async(username, password), lambda token: logged_in(username, token))
+
+        def logged_in(username, token):
+            login_button.config(state='normal')
+            if token is not None:
+                # The GUI's user stays loaded however many other tenants wake_upcoming() loads
+                if self.current_user is not None and self.current_user != username:
+                    self.tenants.unpin(self.current_user)
+                self.tenants.pin(username)
                 self.current_user = username
+                self.session_token = token
                 messagebox.showinfo("Success", "Login successful!")
                 login_window.destroy()
                 self.block_button.config(state='normal')
@@ -244,7 +1186,18 @@ class App:
         login_button = tk.Button(login_window, text="Login", command=login_action)
         login_button.grid(row=2, columnspan=2, pady=10)
 
+    def when_done(self, future, callback):
+        """Call callback(result) on the Tk thread once a background future has finished."""
+        if future.done():
+            callback(future.result())
+        else:
+            self.root.after(50, self.when_done, future, callback)
+
     def block_time_gui(self):
+        import tkinter as tk
+        from tkinter import messagebox
+        from tkcalendar import Calendar  # imported on first use; it loads babel's locale data
+
         block_window = tk.Toplevel(self.root)
         block_window.title("Block Time")
 
@@ -285,31 +1238,47 @@ class App:
             email = email_entry.get()
             description = description_entry.get()
             recurrence = int(recurrence_entry.get()) if recurrence_entry.get() else 1
-
-            result = self.builder.block_time(year, month, day, start_hour, end_hour, name, email, description, recurrence)
-            messagebox.showinfo("Info", result)
+            args = (year, month, day, start_hour, end_hour, name, email, description, recurrence)
+
+            def booked(result):
+                if result.startswith(CONFLICT_MESSAGE):
+                    if messagebox.askyesno("Conflict", result + "\n\nBook it anyway?"):
+                        self.tasks.run(self.builder.block_time, *args, allow_conflicts=True, on_done=booked, on_error=failed)
+                        return
+                else:
+                    messagebox.showinfo("Info", result)
+                if block_window.winfo_exists():
+                    block_button.config(state='normal')
+
+            def failed(error):
+                messagebox.showerror("Error", str(error))
+                if block_window.winfo_exists():
+                    block_button.config(state='normal')
+
+            block_button.config(state='disabled')
+            self.tasks.run(self.builder.block_time, *args, on_done=booked, on_error=failed)
 
         block_button = tk.Button(block_window, text="Block Time", command=block_time_action)
         block_button.grid(row=7, columnspan=2, pady=10)
 
     def view_schedule_gui(self):
+        import tkinter as tk
+        from grid_view_module import CalendarGrid, show_day
+
         view_window = tk.Toplevel(self.root)
         view_window.title("View Schedule")
+        view_window.geometry("900x650")
 
-        tk.Label(view_window, text="Select Date:").grid(row=0, column=0)
-        cal = Calendar(view_window, selectmode='day')
-        cal.grid(row=0, column=1)
-
-        def view_schedule_action():
-            date = cal.selection_get()
-            year, month, day = date.year, date.month, date.day
-            schedule_text = self.builder.view_schedule(year, month, day)
-            messagebox.showinfo("Schedule", schedule_text)
-
-        view_button = tk.Button(view_window, text="View Schedule", command=view_schedule_action)
-        view_button.grid(row=1, columnspan=2, pady=10)
+        # Only the visible weeks are drawn; clicking a day lists all of its events
+        grid = CalendarGrid(view_window, self.builder, mode="month",
+                            on_day=lambda day: show_day(view_window, self.builder, day))
+        grid.pack(fill="both", expand=True)
 
     def delete_event_gui(self):
+        import tkinter as tk
+        from tkinter import messagebox
+        from tkcalendar import Calendar
+
         delete_window = tk.Toplevel(self.root)
         delete_window.title("Delete Event")
 
@@ -338,6 +1307,9 @@ class App:
         delete_button.grid(row=3, columnspan=2, pady=10)
 
     def export_schedule_gui(self):
+        import tkinter as tk
+        from tkinter import messagebox, ttk
+
         export_window = tk.Toplevel(self.root)
         export_window.title("Export Schedule")
 
@@ -345,21 +1317,67 @@ class App:
         format_var = tk.StringVar(value="excel")
         tk.Radiobutton(export_window, text="Excel", variable=format_var, value="excel").grid(row=0, column=1)
         tk.Radiobutton(export_window, text="Word", variable=format_var, value="word").grid(row=1, column=1)
+        tk.Radiobutton(export_window, text="iCalendar", variable=format_var, value="ics").grid(row=2, column=1)
+
+        progress_bar = ttk.Progressbar(export_window, length=240, mode='determinate')
+        progress_bar.grid(row=3, columnspan=2, padx=10, pady=(10, 0))
+        status_label = tk.Label(export_window, text="")
+        status_label.grid(row=4, columnspan=2)
+        running = []  # the export Task while one is running
 
         def export_schedule_action():
             format_selected = format_var.get()
-            result = self.builder.export_schedule(format=format_selected)
+            export_button.config(state='disabled')
+            cancel_button.config(state='normal')
+            progress_bar.config(value=0)
+            status_label.config(text="Exporting...")
+            running.append(self.tasks.run(self.builder.export_schedule, format=format_selected,
+                                          on_done=finished, on_error=failed, on_progress=show_progress))
+
+        def show_progress(done, total):
+            if not export_window.winfo_exists():
+                return
+            if total:
+                progress_bar.config(value=100 * done / total)
+                status_label.config(text=f"{done} of {total} events")
+            else:
+                status_label.config(text=f"{done} events")
+
+        def finished(result):
+            running.clear()
+            if export_window.winfo_exists():
+                export_button.config(state='normal')
+                cancel_button.config(state='disabled')
+                status_label.config(text="")
+                progress_bar.config(value=0)
             messagebox.showinfo("Info", result)
 
+        def failed(error):
+            finished(f"Export failed: {error}")
+
+        def cancel_export():
+            for task in running:
+                task.cancel()
+            cancel_button.config(state='disabled')
+            status_label.config(text="Cancelling...")
+
+        def close_window():
+            cancel_export()
+            export_window.destroy()
+
         export_button = tk.Button(export_window, text="Export", command=export_schedule_action)
-        export_button.grid(row=2, columnspan=2, pady=10)
+        export_button.grid(row=5, column=0, pady=10)
+        cancel_button = tk.Button(export_window, text="Cancel", command=cancel_export, state='disabled')
+        cancel_button.grid(row=5, column=1, pady=10)
+        export_window.protocol("WM_DELETE_WINDOW", close_window)
 
     def run_scheduler(self):
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        # Each loaded user's reminders run on their own thread; this loads users with events coming up
+        self.tenants.run()
 
 if __name__ == "__main__":
+    import tkinter as tk
+
     root = tk.Tk()
     app = App(root)
 
@@ -369,7 +1387,10 @@ if __name__ == "__main__":
 
     root.mainloop()
 # you need these pip installed in your terminal to  run this code
-#     pip install tk
-#     pip install tkcalendar pandas python-docx
-#     pip install pandas openpyxl python-docx
-#     pip install schedule
\ No newline at end of file
+#     pip install tkcalendar openpyxl
+# optional:
+#     pip install pyarrow    (Parquet and Arrow exports)
+#     pip install tzdata     (iCalendar time zones on Windows)
+#     pip install pytest     (the tests)
+# tkinter ships with Python; on Debian/Ubuntu install it with: apt install python3-tk
+# Word files are written without python-docx, and pandas is no longer used
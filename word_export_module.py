@@ -0,0 +1,143 @@
+import re
+import zipfile
+from collections import deque
+from itertools import groupby
+from xml.sax.saxutils import escape
+
+# Every part gets this timestamp so the same schedule always produces the same bytes
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# Months rendered ahead of the writer per worker process
+MONTHS_IN_FLIGHT = 2
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>')
+
+PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>')
+
+DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>')
+
+# Normal plus the two heading styles the export uses, close to Word's defaults
+STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+    '<w:pPr><w:spacing w:after="120"/></w:pPr><w:rPr><w:sz w:val="22"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/><w:pPr><w:keepNext/><w:spacing w:before="480" w:after="0"/>'
+    '<w:outlineLvl w:val="0"/></w:pPr><w:rPr><w:b/><w:color w:val="365F91"/><w:sz w:val="28"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/>'
+    '<w:next w:val="Normal"/><w:qFormat/><w:pPr><w:keepNext/><w:spacing w:before="200" w:after="0"/>'
+    '<w:outlineLvl w:val="1"/></w:pPr><w:rPr><w:b/><w:color w:val="4F81BD"/><w:sz w:val="26"/></w:rPr></w:style>'
+    '</w:styles>')
+
+DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>')
+
+# US Letter with one-inch margins, as python-docx's default template
+DOCUMENT_END = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>')
+
+# Characters XML 1.0 does not allow; they are dropped from the text
+INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+# Function to build one paragraph, optionally with a paragraph style
+def paragraph_xml(text, style=None):
+    text = escape(INVALID_XML.sub("", text))
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f'<w:p>{properties}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+# Function to render one month of (date, rendered day) pairs as document body XML
+def render_month(days):
+    parts = []
+    for date, rendered in days:
+        parts.append(paragraph_xml(f"Date: {date[1]}/{date[2]}/{date[0]}", "Heading2"))
+        for line, description in rendered:
+            parts.append(paragraph_xml(line))
+            if description:
+                parts.append(paragraph_xml(f"Description: {description}"))
+    return "".join(parts)
+
+
+# Function to write one zip member with the fixed timestamp
+def write_part(archive, name, data):
+    info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    archive.writestr(info, data)
+
+
+def export_word(days, path, title="Schedule", workers=1, progress=None, total=None):
+    """Write (date, rendered day) pairs to a .docx file as WordprocessingML, streamed.
+
+    `rendered` is a sequence of (line, description) pairs, as made by
+    ScheduleBuilder.render_day(). The document body is written into the
+    zip one month at a time, so time grows linearly with the schedule,
+    unlike python-docx, whose add_paragraph slows as the document grows.
+    With `workers` > 1, months are rendered to XML in that many processes
+    while this one compresses and writes them in order. Parts carry fixed
+    timestamps and no creation date, so the output bytes depend only on
+    the events. Returns the number of events written.
+    """
+    months = ((month, list(month_days)) for month, month_days in groupby(days, key=lambda item: item[0][:2]))
+    count = 0
+    with zipfile.ZipFile(path, mode='w') as archive:
+        write_part(archive, "[Content_Types].xml", CONTENT_TYPES)
+        write_part(archive, "_rels/.rels", PACKAGE_RELS)
+        write_part(archive, "word/_rels/document.xml.rels", DOCUMENT_RELS)
+        write_part(archive, "word/styles.xml", STYLES)
+        info = zipfile.ZipInfo("word/document.xml", date_time=ZIP_TIMESTAMP)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(info, mode='w') as document:
+            document.write((DOCUMENT_START + paragraph_xml(title, "Heading1")).encode("utf-8"))
+            for events, xml in render_months(months, workers):
+                document.write(xml.encode("utf-8"))
+                count += events
+                if progress is not None:
+                    progress(count, total)
+            document.write(DOCUMENT_END.encode("utf-8"))
+    return count
+
+
+# Function to yield (event count, body XML) per month, in order, rendering in worker processes if asked
+def render_months(months, workers):
+    if workers <= 1:
+        for _, month_days in months:
+            yield sum(len(rendered) for _, rendered in month_days), render_month(month_days)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for _, month_days in months:
+            pending.append((sum(len(rendered) for _, rendered in month_days), pool.submit(render_month, month_days)))
+            # Keep only a few months queued so memory stays bounded on long schedules
+            if len(pending) >= workers * MONTHS_IN_FLIGHT:
+                events, future = pending.popleft()
+                yield events, future.result()
+        while pending:
+            events, future = pending.popleft()
+            yield events, future.result()